@@ -6,6 +6,8 @@ class AppConnector:
     def __init__(self, config_file="config.json"):
         self.config_file = config_file
         self.applications = self._load_config()
+        self._config_mtime = os.stat(self.config_file).st_mtime
+        self._index_applications()
 
     def _load_config(self):
         if not os.path.exists(self.config_file):
@@ -16,14 +18,33 @@ class AppConnector:
         with open(self.config_file, "r") as f:
             return json.load(f).get("applications", [])
 
+    def _index_applications(self):
+        # Tra cứu theo tên ứng dụng trong O(1) thay vì duyệt danh sách
+        self._by_name = {}
+        for app in self.applications:
+            self._by_name.setdefault(app.get("app_name"), app)
+
+    def _reload_if_changed(self):
+        # Chỉ đọc lại config.json khi file đã bị sửa (mtime thay đổi). Nếu file
+        # tạm thời bị xóa hoặc đang được ghi dở, tiếp tục dùng cấu hình hiện tại
+        try:
+            mtime = os.stat(self.config_file).st_mtime
+            if mtime == self._config_mtime:
+                return
+            with open(self.config_file, "r") as f:
+                applications = json.load(f).get("applications", [])
+        except (OSError, ValueError):
+            return
+        self.applications = applications
+        self._config_mtime = mtime
+        self._index_applications()
+
     def get_app_config(self, app_name: str) -> dict or None:
         """
         Lấy cấu hình của một ứng dụng dựa trên tên ứng dụng.
         """
-        for app in self.applications:
-            if app.get("app_name") == app_name:
-                return app
-        return None
+        self._reload_if_changed()
+        return self._by_name.get(app_name)
 
     def add_app_config(self, app_data: dict):
         """
@@ -63,5 +84,8 @@ class AppConnector:
     def _save_config(self):
         with open(self.config_file, "w") as f:
             json.dump({"applications": self.applications}, f, indent=4)
+        # Thay đổi do chính chúng ta ghi không cần đọc lại
+        self._config_mtime = os.stat(self.config_file).st_mtime
+        self._index_applications()
 
 
@@ -10,8 +10,10 @@ import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
 import redis
 from core_agent import PersonalAIAssistant
+from workflow_manager import WorkflowManager, render_placeholders
 from tools import *
 
 # Configure logging
@@ -37,8 +39,12 @@ celery_app.conf.update(
     worker_max_tasks_per_child=1000,
 )
 
+# Runs the independent steps of one workflow layer concurrently (they are I/O bound)
+_STEP_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix='workflow-step')
+
 # Redis client for state management
 redis_client = redis.Redis(host='localhost', port=6379, db=1, decode_responses=True)
+workflow_manager = WorkflowManager(redis_client)
 
 class WorkflowEngine:
     """Engine for managing and executing automated workflows"""
@@ -99,7 +105,7 @@ class WorkflowEngine:
         # Simple implementation - in production, use croniter library
         return datetime.now() + timedelta(hours=1)
     
-    def execute_workflow_steps(self, workflow_id: str) -> Dict[str, Any]:
+    def execute_workflow_steps(self, workflow_id: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Execute all steps in a workflow"""
         workflow_data = redis_client.hgetall(f"workflow:{workflow_id}")
         if not workflow_data:
@@ -108,31 +114,33 @@ class WorkflowEngine:
         steps = json.loads(workflow_data.get('steps', '[]'))
         results = []
         
-        for i, step in enumerate(steps):
-            try:
-                step_result = self._execute_step(step, workflow_data['user_id'])
-                results.append({
-                    'step_index': i,
-                    'step_type': step.get('type'),
-                    'status': 'success',
-                    'result': step_result
-                })
-            except Exception as e:
-                logger.error(f"Error executing step {i} in workflow {workflow_id}: {str(e)}")
-                results.append({
-                    'step_index': i,
-                    'step_type': step.get('type'),
-                    'status': 'error',
-                    'error': str(e)
-                })
-                # Stop execution on error if configured
-                if step.get('stop_on_error', True):
-                    break
+        # Run the dependency layers resolved when the workflow was saved; steps within a
+        # layer don't depend on each other, so they run concurrently
+        parallel_layers = json.loads(workflow_data.get('parallel_layers') or '[]')
+        if parallel_layers:
+            by_id = {step.get('id'): (i, step) for i, step in enumerate(steps)}
+            layers = [[by_id[step_id] for step_id in layer if step_id in by_id] for layer in parallel_layers]
+        else:
+            layers = [[indexed_step] for indexed_step in enumerate(steps)]
+        
+        user_id = workflow_data['user_id']
+        for layer in layers:
+            if len(layer) == 1:
+                outcomes = [self._run_step(workflow_id, user_id, context, *layer[0])]
+            else:
+                outcomes = list(_STEP_EXECUTOR.map(
+                    lambda item: self._run_step(workflow_id, user_id, context, *item), layer
+                ))
+            results.extend(outcomes)
+            
+            # Stop execution on error if configured
+            if any(outcome['status'] == 'error' and step.get('stop_on_error', True)
+                   for outcome, (_, step) in zip(outcomes, layer)):
+                break
         
         # Update workflow statistics
-        redis_client.hset(f"workflow:{workflow_id}", 
-                         'last_run', datetime.now().isoformat())
-        redis_client.hincrby(f"workflow:{workflow_id}", 'run_count', 1)
+        succeeded = all(result['status'] == 'success' for result in results)
+        workflow_manager.record_run(workflow_id, succeeded)
         
         return {
             'workflow_id': workflow_id,
@@ -141,6 +149,35 @@ class WorkflowEngine:
             'results': results
         }
     
+    def _run_step(self, workflow_id: str, user_id: str, context: Dict[str, Any],
+                  i: int, step: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one step and describe its outcome"""
+        try:
+            if context:
+                step = self._render_step(step, context)
+            step_result = self._execute_step(step, user_id)
+            return {
+                'step_index': i,
+                'step_type': step.get('type'),
+                'status': 'success',
+                'result': step_result
+            }
+        except Exception as e:
+            logger.error(f"Error executing step {i} in workflow {workflow_id}: {str(e)}")
+            return {
+                'step_index': i,
+                'step_type': step.get('type'),
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    def _render_step(self, step: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a step with {{placeholders}} in its fields and config filled from context"""
+        rendered = {key: render_placeholders(value, context) for key, value in step.items()}
+        if isinstance(step.get('config'), dict):
+            rendered['config'] = {key: render_placeholders(value, context) for key, value in step['config'].items()}
+        return rendered
+    
     def _execute_step(self, step: Dict[str, Any], user_id: str) -> Any:
         """Execute a single workflow step"""
         step_type = step.get('type')
@@ -194,20 +231,30 @@ workflow_engine = WorkflowEngine()
 
 # Celery Tasks
 @celery_app.task(bind=True)
-def execute_workflow(self, workflow_id: str):
+def execute_workflow(self, workflow_id: str, context: Dict[str, Any] = None):
     """Execute a workflow in the background"""
     try:
         logger.info(f"Executing workflow {workflow_id}")
-        result = workflow_engine.execute_workflow_steps(workflow_id)
-        
-        # Store execution result
-        redis_client.lpush(f"workflow_history:{workflow_id}", json.dumps(result))
-        redis_client.ltrim(f"workflow_history:{workflow_id}", 0, 99)  # Keep last 100 executions
-        
-        return result
+        result = workflow_engine.execute_workflow_steps(workflow_id, context)
     except Exception as e:
         logger.error(f"Error executing workflow {workflow_id}: {str(e)}")
         self.retry(countdown=60, max_retries=3)
+    
+    # Store execution result; the steps already ran, so a failure here must not retry them
+    try:
+        workflow_manager.append_history(workflow_id, result)
+    except Exception as e:
+        logger.error(f"Error storing history for workflow {workflow_id}: {str(e)}")
+    
+    return result
+
+@celery_app.task
+def dispatch_due_workflows():
+    """Queue interval-scheduled workflows whose next run time has passed"""
+    due = workflow_manager.pop_due_workflows()
+    for workflow_id in due:
+        execute_workflow.delay(workflow_id)
+    return len(due)
 
 @celery_app.task
 def process_ai_request(user_id: str, message: str, context: Dict[str, Any] = None):
@@ -282,6 +329,10 @@ celery_app.conf.beat_schedule = {
         'task': 'background_worker.cleanup_old_data',
         'schedule': crontab(hour=2, minute=0),  # Run daily at 2 AM
     },
+    'dispatch-due-workflows': {
+        'task': 'background_worker.dispatch_due_workflows',
+        'schedule': crontab(),  # Every minute
+    },
 }
 
 class EventListener:
@@ -322,15 +373,10 @@ class EventListener:
     
     def trigger_dependent_workflows(self, user_id: str, trigger_type: str, event_data: Dict[str, Any]):
         """Trigger workflows that depend on specific events"""
-        user_workflows = redis_client.smembers(f"user_workflows:{user_id}")
-        
-        for workflow_id in user_workflows:
-            workflow_data = redis_client.hgetall(f"workflow:{workflow_id}")
-            trigger = json.loads(workflow_data.get('trigger', '{}'))
-            
-            if trigger.get('type') == 'event' and trigger.get('event_type') == trigger_type:
-                # Execute workflow asynchronously
-                execute_workflow.delay(workflow_id)
+        # The manager indexes event subscriptions, so only matching workflows are read
+        for workflow_id in workflow_manager.get_event_workflows(trigger_type, user_id):
+            # Execute workflow asynchronously, with the event as its placeholder context
+            execute_workflow.delay(workflow_id, event_data)
     
     def process_email_event(self, user_id: str, event_data: Dict[str, Any]):
         """Process email events and potentially auto-respond or categorize"""
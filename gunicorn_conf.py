@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration for the Secure API and Voice API
+Usage: gunicorn -c gunicorn_conf.py secure_api:app
+       GUNICORN_BIND=0.0.0.0:5001 gunicorn -c gunicorn_conf.py voice_api:app
+"""
+
+import multiprocessing
+import os
+
+# Every worker must sign JWTs and derive the Fernet key from the same secrets;
+# without them each process falls back to its own random value
+_REQUIRED_SECRETS = ('JWT_SECRET', 'MASTER_KEY')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Threaded workers: handlers spend most of their time waiting on Redis and
+# downstream AI calls, so threads keep each worker busy without extra processes
+worker_class = 'gthread'
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+worker_connections = 2048
+keepalive = 5
+
+timeout = 120
+graceful_timeout = 30
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+def on_starting(server):
+    """Refuse to start unless the shared secrets are configured"""
+    missing = [name for name in _REQUIRED_SECRETS if not os.environ.get(name)]
+    if missing:
+        raise RuntimeError(f"Missing required environment variables: {', '.join(missing)}")
+
+def post_worker_init(worker):
+    """Build the security managers in each worker before it takes requests"""
+    from security_manager import initialize_security
+    initialize_security()
@@ -339,24 +339,24 @@ def get_workflows():
         redis_client = redis.Redis(host='localhost', port=6379, db=1, decode_responses=True)
         workflow_manager = WorkflowManager(redis_client)
         
-        workflows = workflow_manager.list_user_workflows(g.user_id)
+        workflows = workflow_manager.list_user_workflows_summary(g.user_id)
         
         # Localize workflow data
         workflows_data = []
         for workflow in workflows:
             # Try to translate workflow name and description
-            localized_name = i18n_manager.translate_for_user(g.user_id, workflow.name)
-            localized_description = i18n_manager.translate_for_user(g.user_id, workflow.description)
+            localized_name = i18n_manager.translate_for_user(g.user_id, workflow['name'])
+            localized_description = i18n_manager.translate_for_user(g.user_id, workflow['description'])
             
             workflows_data.append({
-                'id': workflow.id,
+                'id': workflow['id'],
                 'name': localized_name,
                 'description': localized_description,
-                'original_name': workflow.name if localized_name != workflow.name else None,
-                'status': workflow.status.value,
-                'created_at': workflow.created_at.isoformat(),
-                'last_run': workflow.last_run.isoformat() if workflow.last_run else None,
-                'run_count': workflow.run_count
+                'original_name': workflow['name'] if localized_name != workflow['name'] else None,
+                'status': workflow['status'],
+                'created_at': workflow['created_at'],
+                'last_run': workflow['last_run'],
+                'run_count': workflow['run_count']
             })
         
         return localized_response({'workflows': workflows_data})
@@ -3,91 +3,279 @@ Secure API with Authentication and Authorization Middleware
 Enhanced version of backend_api.py with comprehensive security features
 """
 
-from flask import Flask, request, jsonify, g
+from flask import Flask, Response, request, jsonify, g
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import logging
-import json
+import orjson
+from dataclasses import dataclass
 from datetime import datetime
 from functools import wraps
 from typing import Dict, Any, Optional, Tuple
 import os
+import queue
+import threading
+import time
+import redis
 from security_manager import (
-    auth_manager, authz_manager, security_monitor, encryption_manager,
-    UserRole, SecurityLevel
+    get_auth_manager, get_authz_manager, get_security_monitor,
+    UserRole, initialize_security
 )
+from workflow_manager import WorkflowManager
+from scheduler import ai_scheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (serializes datetime, enum and dataclass natively)"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Behind reverse proxies, trust only the X-Forwarded-For entries they append;
+# REMOTE_ADDR then holds the real client address
+_TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 0))
+if _TRUSTED_PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=_TRUSTED_PROXY_HOPS)
 CORS(app, origins="*")
 
+# Shared Redis connection pools (db 1: workflows, db 4: security)
+_POOLS = {
+    db: redis.ConnectionPool(host='localhost', port=6379, db=db,
+                             decode_responses=True, max_connections=64)
+    for db in (1, 4)
+}
+
+def _redis(db: int) -> redis.Redis:
+    """Get a Redis client backed by the shared pool for a database"""
+    return redis.Redis(connection_pool=_POOLS[db])
+
+workflow_manager = WorkflowManager(_redis(1))
+
+# Pre-encoded bodies for constant error responses
+_ERR_INTERNAL = orjson.dumps({'error': 'Internal server error'})
+_ERR_NOT_FOUND = orjson.dumps({'error': 'Endpoint not found'})
+_ERR_METHOD_NOT_ALLOWED = orjson.dumps({'error': 'Method not allowed'})
+_ERR_AUTH_REQUIRED = orjson.dumps({'error': 'Authentication required'})
+_ERR_MISSING_AUTH_HEADER = orjson.dumps({'error': 'Missing or invalid authorization header'})
+_ERR_INVALID_TOKEN = orjson.dumps({'error': 'Invalid or expired token'})
+_ERR_INSUFFICIENT_PERMISSIONS = orjson.dumps({'error': 'Insufficient permissions'})
+_ERR_INSUFFICIENT_ROLE = orjson.dumps({'error': 'Insufficient role'})
+_ERR_RATE_LIMITED = orjson.dumps({'error': 'Rate limit exceeded'})
+
+def _error_response(body: bytes, status: int) -> Response:
+    """Build an error response from a pre-encoded JSON body"""
+    return Response(body, status=status, mimetype='application/json')
+
+# Direct value -> UserRole lookup, bypassing Enum.__call__
+_ROLE_MAP = {role.value: role for role in UserRole}
+
+_ai_assistant = None
+
+def _get_ai_assistant():
+    """Get the shared AI assistant, importing core_agent on first use"""
+    global _ai_assistant
+    if _ai_assistant is None:
+        # core_agent configures Gemini/AutoGen at import time and requires
+        # GOOGLE_API_KEY, so it is loaded once here rather than at startup
+        from core_agent import PersonalAIAssistant
+        _ai_assistant = PersonalAIAssistant()
+    return _ai_assistant
+
+# Server-side filter over the security event log: scans up to ARGV[5] newest
+# entries and returns only the raw events matching severity/event_type/since
+_FILTER_EVENTS_LUA = """
+local limit = tonumber(ARGV[1])
+local severity, event_type, since = ARGV[2], ARGV[3], ARGV[4]
+local out = {}
+for _, raw in ipairs(redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[5]) - 1)) do
+    local event = cjson.decode(raw)
+    if since ~= '' and event.timestamp < since then
+        break
+    end
+    if (severity == '' or event.severity == severity)
+            and (event_type == '' or event.event_type == event_type) then
+        out[#out + 1] = raw
+        if #out >= limit then
+            break
+        end
+    end
+end
+return out
+"""
+_filter_security_events = _redis(4).register_script(_FILTER_EVENTS_LUA)
+
+# Background threat analysis: the middleware only enqueues requests, and a
+# worker thread analyzes them in short windows with one Redis pipeline each
+_THREAT_BATCH_WINDOW = 0.02  # seconds
+_THREAT_BATCH_MAX = 512
+_threat_queue = queue.SimpleQueue()
+
+def _threat_analysis_worker():
+    """Drain queued requests and analyze them in batches"""
+    while True:
+        batch = [_threat_queue.get()]
+        deadline = time.monotonic() + _THREAT_BATCH_WINDOW
+        while len(batch) < _THREAT_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_threat_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        try:
+            threats = get_security_monitor().analyze_batch(batch)
+        except Exception as e:
+            logger.error(f"Error in threat analysis: {str(e)}")
+            continue
+        
+        for threat in threats:
+            logger.warning(f"Security threat detected: {threat.description}")
+
+threading.Thread(target=_threat_analysis_worker, name='threat-analysis', daemon=True).start()
+
 # Security middleware
 def security_middleware():
     """Security middleware to analyze all requests"""
-    ip_address = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
-    user_agent = request.headers.get('User-Agent', '')
+    ip_address = g.ip
+    user_agent = g.ua
     endpoint = request.endpoint or request.path
     
     # Get user ID if authenticated
-    user_id = getattr(g, 'user_id', None)
-    
-    # Analyze request for threats
-    threats = security_monitor.analyze_request(ip_address, user_agent, endpoint, user_id)
+    user_id = g.user_id
     
-    # Log threats
-    for threat in threats:
-        logger.warning(f"Security threat detected: {threat.description}")
-        
-        # Block request if critical threat
-        if threat.severity == SecurityLevel.CRITICAL:
-            return jsonify({'error': 'Request blocked due to security threat'}), 403
+    # Queue request for batched threat analysis; none of the monitor's
+    # detectors raise CRITICAL, so nothing needs to block inline
+    _threat_queue.put((ip_address, user_agent, endpoint, user_id, time.time()))
     
     return None
 
+# Per-IP token buckets: ip -> (last_refill, tokens), kept in LRU order.
+# Buckets live in each worker process, so with N gunicorn workers a client
+# can get up to N times these rates
+_RATE_LIMIT_CAPACITY = 10.0
+_RATE_LIMIT_REFILL_PER_SEC = 5.0
+_RATE_LIMIT_MAX_BUCKETS = 100000
+_buckets: Dict[str, Tuple[float, float]] = {}
+_buckets_lock = threading.Lock()
+
+def _rate_limited(ip_address: str) -> bool:
+    """Take a token from the IP's bucket; True if the bucket is empty"""
+    now = time.monotonic()
+    with _buckets_lock:
+        last, tokens = _buckets.pop(ip_address, (now, _RATE_LIMIT_CAPACITY))
+        tokens = min(_RATE_LIMIT_CAPACITY, tokens + (now - last) * _RATE_LIMIT_REFILL_PER_SEC)
+        limited = tokens < 1.0
+        _buckets[ip_address] = (now, tokens if limited else tokens - 1.0)
+        if len(_buckets) > _RATE_LIMIT_MAX_BUCKETS:
+            del _buckets[next(iter(_buckets))]
+    return limited
+
 @app.before_request
 def before_request():
     """Execute before each request"""
+    # Default identity; require_auth fills these in for authenticated requests
+    g.user_id = None
+    g.username = None
+    g.user_role = None
+    g.token = None
+    
+    # Client address and user agent, read once from the WSGI environ
+    env = request.environ
+    g.ip = env.get('REMOTE_ADDR')
+    g.ua = env.get('HTTP_USER_AGENT', '')
+    
+    # Load-balancer health probes are never throttled
+    if request.endpoint != 'health_check' and _rate_limited(g.ip):
+        return _error_response(_ERR_RATE_LIMITED, 429)
+    
     # Apply security middleware
     security_response = security_middleware()
     if security_response:
         return security_response
 
+def _authenticate() -> Optional[Response]:
+    """Validate the bearer token and store user info on g; returns an error response on failure"""
+    auth_header = request.headers.get('Authorization')
+    
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return _error_response(_ERR_MISSING_AUTH_HEADER, 401)
+    
+    token = auth_header[7:]
+    is_valid, payload = get_auth_manager().validate_token(token)
+    
+    if not is_valid:
+        return _error_response(_ERR_INVALID_TOKEN, 401)
+    
+    role = _ROLE_MAP.get(payload['role'])
+    if role is None:
+        return _error_response(_ERR_INVALID_TOKEN, 401)
+    
+    # Store user info in request context
+    g.token = token
+    g.user_id = payload['user_id']
+    g.username = payload['username']
+    g.user_role = role
+    
+    return None
+
 def require_auth(f):
     """Decorator to require authentication"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get('Authorization')
-        
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'Missing or invalid authorization header'}), 401
-        
-        token = auth_header.split(' ')[1]
-        is_valid, payload = auth_manager.validate_token(token)
-        
-        if not is_valid:
-            return jsonify({'error': 'Invalid or expired token'}), 401
-        
-        # Store user info in request context
-        g.user_id = payload['user_id']
-        g.username = payload['username']
-        g.user_role = UserRole(payload['role'])
+        error = _authenticate()
+        if error is not None:
+            return error
         
         return f(*args, **kwargs)
     
     return decorated_function
 
+def authorized(permission: str):
+    """Decorator to require authentication and a specific permission in one wrapper"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            error = _authenticate()
+            if error is not None:
+                return error
+            
+            # Managers are resolved per request so importing this module builds none of them
+            authz = get_authz_manager()
+            if not authz.role_mask(g.user_role) & authz.permission_bit(permission):
+                return _error_response(_ERR_INSUFFICIENT_PERMISSIONS, 403)
+            
+            return f(*args, **kwargs)
+        
+        return decorated_function
+    return decorator
+
 def require_permission(permission: str):
     """Decorator to require specific permission"""
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not hasattr(g, 'user_role'):
-                return jsonify({'error': 'Authentication required'}), 401
+            if g.user_role is None:
+                return _error_response(_ERR_AUTH_REQUIRED, 401)
             
-            if not authz_manager.check_permission(g.user_role, permission):
-                return jsonify({'error': 'Insufficient permissions'}), 403
+            authz = get_authz_manager()
+            if not authz.role_mask(g.user_role) & authz.permission_bit(permission):
+                return _error_response(_ERR_INSUFFICIENT_PERMISSIONS, 403)
             
             return f(*args, **kwargs)
         
@@ -99,17 +287,66 @@ def require_role(required_role: UserRole):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not hasattr(g, 'user_role'):
-                return jsonify({'error': 'Authentication required'}), 401
+            if g.user_role is None:
+                return _error_response(_ERR_AUTH_REQUIRED, 401)
             
             if g.user_role != required_role and g.user_role != UserRole.ADMIN:
-                return jsonify({'error': 'Insufficient role'}), 403
+                return _error_response(_ERR_INSUFFICIENT_ROLE, 403)
             
             return f(*args, **kwargs)
         
         return decorated_function
     return decorator
 
+# List response helpers
+def _stream_json_list(key: str, items, fmt):
+    """Encode {key: [...]} incrementally, one item at a time"""
+    yield b'{' + orjson.dumps(key) + b':['
+    first = True
+    for item in items:
+        if not first:
+            yield b','
+        first = False
+        yield orjson.dumps(fmt(item))
+    yield b']}'
+
+@dataclass(slots=True)
+class WorkflowSummary:
+    """Workflow fields returned by GET /api/workflows"""
+    id: str
+    name: str
+    description: str
+    status: str
+    created_at: str
+    last_run: Optional[str]
+    run_count: int
+
+@dataclass(slots=True)
+class TaskSummary:
+    """Scheduled task fields returned by GET /api/tasks"""
+    id: str
+    name: str
+    description: str
+    task_type: str
+    status: str
+    next_run: Optional[datetime]
+    last_run: Optional[datetime]
+    run_count: int
+
+def _format_workflow(workflow: Dict[str, Any]) -> WorkflowSummary:
+    """Convert a workflow listing entry to its JSON-serializable summary"""
+    return WorkflowSummary(
+        workflow['id'], workflow['name'], workflow['description'], workflow['status'],
+        workflow['created_at'], workflow['last_run'], workflow['run_count']
+    )
+
+def _format_task(task) -> TaskSummary:
+    """Convert a scheduled task to its JSON-serializable summary"""
+    return TaskSummary(
+        task.id, task.name, task.description, task.task_type, task.status.value,
+        task.next_run, task.last_run, task.run_count
+    )
+
 # Authentication endpoints
 @app.route('/api/auth/register', methods=['POST'])
 def register():
@@ -117,15 +354,17 @@ def register():
     try:
         data = request.get_json()
         
-        if not data or not all(k in data for k in ['username', 'email', 'password']):
+        if not data:
             return jsonify({'error': 'Missing required fields'}), 400
         
-        username = data['username']
-        email = data['email']
-        password = data['password']
+        username = data.get('username')
+        email = data.get('email')
+        password = data.get('password')
+        if username is None or email is None or password is None:
+            return jsonify({'error': 'Missing required fields'}), 400
         role = UserRole(data.get('role', 'user'))
         
-        success, result = auth_manager.register_user(username, email, password, role)
+        success, result = get_auth_manager().register_user(username, email, password, role)
         
         if success:
             return jsonify({
@@ -137,7 +376,7 @@ def register():
             
     except Exception as e:
         logger.error(f"Error in register: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 @app.route('/api/auth/login', methods=['POST'])
 def login():
@@ -145,16 +384,15 @@ def login():
     try:
         data = request.get_json()
         
-        if not data or not all(k in data for k in ['username', 'password']):
+        if not data:
             return jsonify({'error': 'Missing username or password'}), 400
         
-        username = data['username']
-        password = data['password']
-        ip_address = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
-        user_agent = request.headers.get('User-Agent', '')
-        
-        success, access_token, refresh_token = auth_manager.authenticate_user(
-            username, password, ip_address, user_agent
+        username = data.get('username')
+        password = data.get('password')
+        if username is None or password is None:
+            return jsonify({'error': 'Missing username or password'}), 400
+        success, access_token, refresh_token = get_auth_manager().authenticate_user(
+            username, password, g.ip, g.ua
         )
         
         if success:
@@ -168,7 +406,7 @@ def login():
             
     except Exception as e:
         logger.error(f"Error in login: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 @app.route('/api/auth/refresh', methods=['POST'])
 def refresh_token():
@@ -180,7 +418,7 @@ def refresh_token():
             return jsonify({'error': 'Missing refresh token'}), 400
         
         refresh_token = data['refresh_token']
-        success, new_access_token = auth_manager.refresh_access_token(refresh_token)
+        success, new_access_token = get_auth_manager().refresh_access_token(refresh_token)
         
         if success:
             return jsonify({
@@ -192,17 +430,14 @@ def refresh_token():
             
     except Exception as e:
         logger.error(f"Error in refresh_token: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 @app.route('/api/auth/logout', methods=['POST'])
 @require_auth
 def logout():
     """Logout user"""
     try:
-        auth_header = request.headers.get('Authorization')
-        token = auth_header.split(' ')[1]
-        
-        success = auth_manager.logout_user(token)
+        success = get_auth_manager().logout_user(g.token)
         
         if success:
             return jsonify({'message': 'Logged out successfully'}), 200
@@ -211,12 +446,11 @@ def logout():
             
     except Exception as e:
         logger.error(f"Error in logout: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 # Protected endpoints
 @app.route('/api/chat', methods=['POST'])
-@require_auth
-@require_permission('task:create')
+@authorized('task:create')
 def chat():
     """Process chat message with AI assistant"""
     try:
@@ -232,57 +466,34 @@ def chat():
         context['user_id'] = g.user_id
         context['username'] = g.username
         
-        # Process with AI assistant (import here to avoid circular imports)
-        from core_agent import PersonalAIAssistant
-        ai_assistant = PersonalAIAssistant()
-        
-        response = ai_assistant.process_request(g.user_id, message, context)
+        # Process with the shared AI assistant
+        response = _get_ai_assistant().process_request(g.user_id, message, context)
         
         return jsonify({
             'response': response,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         }), 200
         
     except Exception as e:
         logger.error(f"Error in chat: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 @app.route('/api/workflows', methods=['GET'])
-@require_auth
-@require_permission('workflow:read_own')
+@authorized('workflow:read_own')
 def get_workflows():
     """Get user's workflows"""
     try:
-        from workflow_manager import WorkflowManager
-        import redis
-        
-        redis_client = redis.Redis(host='localhost', port=6379, db=1, decode_responses=True)
-        workflow_manager = WorkflowManager(redis_client)
-        
-        workflows = workflow_manager.list_user_workflows(g.user_id)
+        workflows = workflow_manager.list_user_workflows_summary(g.user_id)
         
-        # Convert to JSON-serializable format
-        workflows_data = []
-        for workflow in workflows:
-            workflows_data.append({
-                'id': workflow.id,
-                'name': workflow.name,
-                'description': workflow.description,
-                'status': workflow.status.value,
-                'created_at': workflow.created_at.isoformat(),
-                'last_run': workflow.last_run.isoformat() if workflow.last_run else None,
-                'run_count': workflow.run_count
-            })
-        
-        return jsonify({'workflows': workflows_data}), 200
+        return Response(_stream_json_list('workflows', workflows, _format_workflow),
+                        mimetype='application/json'), 200
         
     except Exception as e:
         logger.error(f"Error in get_workflows: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 @app.route('/api/workflows', methods=['POST'])
-@require_auth
-@require_permission('workflow:create')
+@authorized('workflow:create')
 def create_workflow():
     """Create new workflow"""
     try:
@@ -291,12 +502,6 @@ def create_workflow():
         if not data:
             return jsonify({'error': 'Missing workflow data'}), 400
         
-        from workflow_manager import WorkflowManager
-        import redis
-        
-        redis_client = redis.Redis(host='localhost', port=6379, db=1, decode_responses=True)
-        workflow_manager = WorkflowManager(redis_client)
-        
         workflow_id = workflow_manager.create_workflow(g.user_id, data)
         
         return jsonify({
@@ -304,22 +509,18 @@ def create_workflow():
             'workflow_id': workflow_id
         }), 201
         
+    except ValueError as e:
+        # Invalid step graph or enum value in the submitted config
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Error in create_workflow: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 @app.route('/api/workflows/<workflow_id>', methods=['DELETE'])
-@require_auth
-@require_permission('workflow:delete_own')
+@authorized('workflow:delete_own')
 def delete_workflow(workflow_id):
     """Delete workflow"""
     try:
-        from workflow_manager import WorkflowManager
-        import redis
-        
-        redis_client = redis.Redis(host='localhost', port=6379, db=1, decode_responses=True)
-        workflow_manager = WorkflowManager(redis_client)
-        
         # Check if workflow belongs to user
         workflow = workflow_manager.get_workflow(workflow_id)
         if not workflow or workflow.user_id != g.user_id:
@@ -334,41 +535,24 @@ def delete_workflow(workflow_id):
             
     except Exception as e:
         logger.error(f"Error in delete_workflow: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 @app.route('/api/tasks', methods=['GET'])
-@require_auth
-@require_permission('task:read_own')
+@authorized('task:read_own')
 def get_tasks():
     """Get user's scheduled tasks"""
     try:
-        from scheduler import ai_scheduler
-        
         tasks = ai_scheduler.list_user_tasks(g.user_id)
         
-        # Convert to JSON-serializable format
-        tasks_data = []
-        for task in tasks:
-            tasks_data.append({
-                'id': task.id,
-                'name': task.name,
-                'description': task.description,
-                'task_type': task.task_type,
-                'status': task.status.value,
-                'next_run': task.next_run.isoformat() if task.next_run else None,
-                'last_run': task.last_run.isoformat() if task.last_run else None,
-                'run_count': task.run_count
-            })
-        
-        return jsonify({'tasks': tasks_data}), 200
+        return Response(_stream_json_list('tasks', tasks, _format_task),
+                        mimetype='application/json'), 200
         
     except Exception as e:
         logger.error(f"Error in get_tasks: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 @app.route('/api/tasks', methods=['POST'])
-@require_auth
-@require_permission('task:create')
+@authorized('task:create')
 def create_task():
     """Create new scheduled task"""
     try:
@@ -377,8 +561,6 @@ def create_task():
         if not data:
             return jsonify({'error': 'Missing task data'}), 400
         
-        from scheduler import ai_scheduler
-        
         task_id = ai_scheduler.schedule_task(g.user_id, data)
         
         return jsonify({
@@ -388,7 +570,7 @@ def create_task():
         
     except Exception as e:
         logger.error(f"Error in create_task: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 @app.route('/api/security/events', methods=['GET'])
 @require_auth
@@ -396,29 +578,49 @@ def create_task():
 def get_security_events():
     """Get security events (admin only)"""
     try:
-        import redis
-        
-        redis_client = redis.Redis(host='localhost', port=6379, db=4, decode_responses=True)
+        redis_client = _redis(4)
         
         limit = request.args.get('limit', 100, type=int)
-        events_data = redis_client.lrange("security_events", 0, limit - 1)
+        severity = request.args.get('severity', '')
+        event_type = request.args.get('event_type', '')
+        since = request.args.get('since', '')
+        
+        if severity or event_type or since:
+            # Filter inside Redis so only matching events cross the wire
+            events_data = _filter_security_events(
+                keys=["security_events"],
+                args=[limit, severity, event_type, since, 10000],
+                client=redis_client
+            )
+        else:
+            events_data = redis_client.lrange("security_events", 0, limit - 1)
         
-        events = [json.loads(event) for event in events_data]
+        loads = orjson.loads
+        events = [loads(event) for event in events_data]
         
-        return jsonify({'events': events}), 200
+        # Encode directly with orjson rather than round-tripping through jsonify
+        return app.response_class(orjson.dumps({'events': events}), mimetype='application/json'), 200
         
     except Exception as e:
         logger.error(f"Error in get_security_events: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
+
+# Encoded health payload, refreshed at most once per second: [built_at, body]
+_HEALTH_CACHE = [float('-inf'), b'']
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
-        'version': '2.0.0'
-    }), 200
+    now = time.monotonic()
+    cache = _HEALTH_CACHE
+    if now - cache[0] >= 1.0:
+        cache[1] = orjson.dumps({
+            'status': 'healthy',
+            'timestamp': datetime.now(),
+            'version': '2.0.0'
+        })
+        cache[0] = now
+    return Response(cache[1], mimetype='application/json'), 200
 
 @app.route('/api/user/profile', methods=['GET'])
 @require_auth
@@ -433,26 +635,26 @@ def get_user_profile():
         
     except Exception as e:
         logger.error(f"Error in get_user_profile: {str(e)}")
-        return jsonify({'error': 'Internal server error'}), 500
+        return _error_response(_ERR_INTERNAL, 500)
 
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'error': 'Endpoint not found'}), 404
+    return _error_response(_ERR_NOT_FOUND, 404)
 
 @app.errorhandler(405)
 def method_not_allowed(error):
-    return jsonify({'error': 'Method not allowed'}), 405
+    return _error_response(_ERR_METHOD_NOT_ALLOWED, 405)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'error': 'Internal server error'}), 500
+    return _error_response(_ERR_INTERNAL, 500)
 
 if __name__ == '__main__':
     # Initialize security system
-    from security_manager import initialize_security
     initialize_security()
     
-    # Run the secure API
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    # Development server only; in production run:
+    #   gunicorn -c gunicorn_conf.py secure_api:app
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
 
@@ -8,23 +8,33 @@ import jwt
 import bcrypt
 import secrets
 import hashlib
+import importlib.metadata
+import platform
+import ssl
+import tempfile
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, NamedTuple, Optional, Set, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 import redis
 import json
+import orjson
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import serialization
 import base64
 import ipaddress
-import re
 from passlib.context import CryptContext
 from argon2 import PasswordHasher
+from argon2.low_level import Type, hash_secret_raw
+import atexit
+import queue
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 import time
 
 logger = logging.getLogger(__name__)
@@ -69,31 +79,189 @@ class User:
     two_factor_enabled: bool
     two_factor_secret: Optional[str]
 
+class AuthSlice(NamedTuple):
+    """The few user fields a login needs, read without materializing a User"""
+    id: str
+    username: str
+    role: UserRole
+    password_hash: str
+    is_active: bool
+    failed_login_attempts: int
+    locked_until: int  # epoch seconds, 0 when not locked
+
+def _random_id() -> str:
+    """URL-safe random ID with 128 bits of entropy"""
+    # Drawn fresh from the OS each time, so forked workers never share a stream
+    return secrets.token_urlsafe(16)
+
+# Allowed ASCII bytes per input field; bytes.translate(None, allowed) deletes
+# them, so a value is valid when nothing is left over
+_ALPHA_BYTES = b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_USERNAME_BYTES = _ALPHA_BYTES + b'0123456789_.-'
+_EMAIL_LOCAL_BYTES = _ALPHA_BYTES + b'0123456789._%+-'
+_EMAIL_DOMAIN_BYTES = _ALPHA_BYTES + b'0123456789.-'
+
+# Password character classes as bit flags, looked up per character
+_PW_UPPER, _PW_LOWER, _PW_DIGIT, _PW_SPECIAL = 1, 2, 4, 8
+_PASSWORD_CHAR_CLASSES = {
+    **{c: _PW_UPPER for c in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'},
+    **{c: _PW_LOWER for c in 'abcdefghijklmnopqrstuvwxyz'},
+    **{c: _PW_DIGIT for c in '0123456789'},
+    **{c: _PW_SPECIAL for c in '!@#$%^&*(),.?":{}|<>'},
+}
+
+# Shared Argon2 parameters; the version in the key lets a new calibration scheme
+# ignore values stored by older ones
+_ARGON2_PARAMS_KEY = "argon2:params:v2"
+_ARGON2_PARAMS_TTL = 7 * 86400
+_ARGON2_MEMORY_COST = 64 * 1024  # KiB
+_ARGON2_MAX_TIME_COST = 16
+
 class EncryptionManager:
     """Handles data encryption and decryption"""
     
-    def __init__(self, master_key: Optional[str] = None):
+    def __init__(self, master_key: Optional[str] = None, redis_client: Optional[redis.Redis] = None):
+        self.redis = redis_client
+        
         if master_key:
             self.master_key = master_key.encode()
         else:
             self.master_key = os.environ.get('MASTER_KEY', self._generate_master_key()).encode()
+        # A generated key only lives in this process, so nothing it encrypts may be persisted
+        self._master_key_configured = bool(master_key or os.environ.get('MASTER_KEY'))
         
-        # Initialize Fernet for symmetric encryption
-        kdf = PBKDF2HMAC(
+        # Initialize Fernet for symmetric encryption. MASTER_KEY is a high-entropy
+        # secret rather than a password, so a single HKDF expansion is sufficient
+        kdf = HKDF(
             algorithm=hashes.SHA256(),
             length=32,
             salt=b'ai_assistant_salt',
-            iterations=100000,
+            info=b'fernet-v1',
         )
         key = base64.urlsafe_b64encode(kdf.derive(self.master_key))
         self.fernet = Fernet(key)
         
-        # Generate RSA key pair for asymmetric encryption
-        self.private_key = rsa.generate_private_key(
+        # RSA key pair for asymmetric encryption, loaded or generated on first use
+        self._private_key = None
+        self._rsa_lock = threading.Lock()
+        
+        # Shared Argon2 hasher, with parameters fitted to this deployment
+        time_cost, memory_cost, parallelism = self._argon2_parameters()
+        self._ph = PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism
+        )
+        
+        # argon2-cffi releases the GIL while hashing, so request threads already
+        # hash in parallel; cap how many run at once to bound memory_cost x N
+        max_hashes = int(os.environ.get('ARGON2_MAX_CONCURRENCY', max((os.cpu_count() or 2) - 1, 1)))
+        self._hash_slots = threading.BoundedSemaphore(max_hashes)
+    
+    def _argon2_parameters(self) -> Tuple[int, int, int]:
+        """Resolve Argon2 (time_cost, memory_cost, parallelism) from env, Redis or calibration"""
+        if 'ARGON2_TIME_COST' in os.environ or 'ARGON2_MEMORY_COST' in os.environ:
+            return (
+                int(os.environ.get('ARGON2_TIME_COST', 3)),
+                int(os.environ.get('ARGON2_MEMORY_COST', 65536)),
+                int(os.environ.get('ARGON2_PARALLELISM', 4))
+            )
+        
+        if self.redis is not None:
+            try:
+                cached = self.redis.get(_ARGON2_PARAMS_KEY)
+                if cached:
+                    return tuple(int(v) for v in cached.split(','))
+            except redis.RedisError as e:
+                logger.warning(f"Could not read cached Argon2 parameters: {e}")
+        
+        params = self._calibrate_argon2(int(os.environ.get('ARGON2_TARGET_MS', 250)))
+        
+        if self.redis is not None:
+            try:
+                # First worker to finish wins so every process hashes with the same cost;
+                # expiring it lets a calibration made on a loaded host be redone
+                self.redis.set(_ARGON2_PARAMS_KEY, ','.join(map(str, params)), nx=True, ex=_ARGON2_PARAMS_TTL)
+                params = tuple(int(v) for v in self.redis.get(_ARGON2_PARAMS_KEY).split(','))
+            except redis.RedisError as e:
+                logger.warning(f"Could not cache Argon2 parameters: {e}")
+        
+        return params
+    
+    def _calibrate_argon2(self, target_ms: int) -> Tuple[int, int, int]:
+        """Raise Argon2 time cost at a fixed memory cost until one hash takes at least target_ms"""
+        time_cost = 2
+        parallelism = min(os.cpu_count() or 1, 4)
+        # Memory stays fixed: every worker process may run several hashes at once
+        memory_cost = _ARGON2_MEMORY_COST
+        
+        while True:
+            start = time.perf_counter_ns()
+            hash_secret_raw(b'calibration', secrets.token_bytes(16), time_cost,
+                            memory_cost, parallelism, 32, Type.ID)
+            elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000
+            if elapsed_ms >= target_ms or time_cost >= _ARGON2_MAX_TIME_COST:
+                break
+            # Hash time is roughly linear in time_cost
+            time_cost = min(_ARGON2_MAX_TIME_COST, max(time_cost + 1, int(time_cost * target_ms / max(elapsed_ms, 1.0))))
+        
+        logger.info(f"Calibrated Argon2: t={time_cost}, m={memory_cost} KiB, p={parallelism} ({elapsed_ms:.0f} ms)")
+        return time_cost, memory_cost, parallelism
+    
+    @property
+    def private_key(self) -> rsa.RSAPrivateKey:
+        """RSA private key, read from RSA_KEY_PATH or generated (and persisted there) on first use"""
+        if self._private_key is None:
+            with self._rsa_lock:
+                if self._private_key is None:
+                    self._private_key = self._load_or_generate_rsa_key(os.environ.get('RSA_KEY_PATH'))
+        return self._private_key
+    
+    @property
+    def public_key(self) -> rsa.RSAPublicKey:
+        """RSA public key"""
+        return self.private_key.public_key()
+    
+    def _load_or_generate_rsa_key(self, key_path: Optional[str]) -> rsa.RSAPrivateKey:
+        """Load a MASTER_KEY-encrypted PEM key, generating and saving one if it does not exist"""
+        if key_path and not self._master_key_configured:
+            raise RuntimeError("MASTER_KEY must be set to use a persisted RSA key (RSA_KEY_PATH)")
+        
+        if key_path and os.path.exists(key_path):
+            return self._read_rsa_key(key_path)
+        
+        private_key = rsa.generate_private_key(
             public_exponent=65537,
             key_size=2048,
         )
-        self.public_key = self.private_key.public_key()
+        
+        if key_path:
+            pem = private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.BestAvailableEncryption(self.master_key)
+            )
+            # Write a complete file next to the target, then link it into place;
+            # linking fails if another worker got there first, and we use theirs
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(key_path)))
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(pem)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.link(tmp_path, key_path)
+            except FileExistsError:
+                return self._read_rsa_key(key_path)
+            finally:
+                os.unlink(tmp_path)
+            logger.info(f"Generated RSA key pair at {key_path}")
+        
+        return private_key
+    
+    def _read_rsa_key(self, key_path: str) -> rsa.RSAPrivateKey:
+        """Load a MASTER_KEY-encrypted PEM private key"""
+        with open(key_path, 'rb') as f:
+            return serialization.load_pem_private_key(f.read(), password=self.master_key)
     
     def _generate_master_key(self) -> str:
         """Generate a new master key"""
@@ -134,17 +302,53 @@ class EncryptionManager:
     
     def hash_password(self, password: str) -> str:
         """Hash password using Argon2"""
-        ph = PasswordHasher()
-        return ph.hash(password)
+        with self._hash_slots:
+            return self._ph.hash(password)
     
     def verify_password(self, password: str, hashed: str) -> bool:
         """Verify password against hash"""
-        ph = PasswordHasher()
         try:
-            ph.verify(hashed, password)
+            with self._hash_slots:
+                self._ph.verify(hashed, password)
             return True
         except:
             return False
+    
+    def password_needs_rehash(self, hashed: str) -> bool:
+        """Check whether a hash was made with different Argon2 parameters"""
+        return self._ph.check_needs_rehash(hashed)
+
+_FAILED_LOGIN_LUA = """
+local attempts, locked_until = 0, 0
+local state = redis.call('GET', KEYS[1])
+if state then
+    local sep = string.find(state, ':', 1, true)
+    attempts = tonumber(string.sub(state, 1, sep - 1))
+    locked_until = tonumber(string.sub(state, sep + 1))
+end
+attempts = attempts + 1
+if attempts >= tonumber(ARGV[2]) then
+    locked_until = tonumber(ARGV[1]) + tonumber(ARGV[3])
+end
+redis.call('SET', KEYS[1], attempts .. ':' .. locked_until, 'EX', ARGV[4])
+return {attempts, locked_until}
+"""
+
+# Seconds between attempts to restart a pub/sub listener while Redis is unreachable
+_LISTENER_RETRY_INTERVAL = 5.0
+
+def _listener_alive(listener) -> bool:
+    """Whether a run_in_thread pub/sub worker is still receiving messages"""
+    return listener is not None and listener.is_alive()
+
+def _stop_listener(listener):
+    """Close the pub/sub connection of a (possibly dead) listener thread"""
+    if listener is None:
+        return
+    try:
+        listener.stop()
+    except redis.RedisError:
+        pass
 
 class AuthenticationManager:
     """Handles user authentication and session management"""
@@ -167,6 +371,24 @@ class AuthenticationManager:
         self.require_lowercase = True
         self.require_numbers = True
         self.require_special_chars = True
+        
+        # Failed-login counter and lockout packed into one 'attempts:locked_until' key
+        self._failed_login_script = self.redis.register_script(_FAILED_LOGIN_LUA)
+        
+        # Process-local cache of validated tokens: sha256 -> (expires_at, payload)
+        self.token_cache_size = 10000
+        self.token_cache_ttl = 60
+        self._token_cache: OrderedDict = OrderedDict()
+        self._token_cache_lock = threading.Lock()
+        self._revocation_listener = None
+        self._revocation_retry_at = 0.0
+        
+        # Security events are buffered and written by a background flusher
+        self.event_flush_interval = 0.05  # seconds
+        self.event_batch_size = 256
+        self._event_queue: queue.Queue = queue.Queue(maxsize=1024)
+        self._event_flusher = None
+        self._event_flusher_lock = threading.Lock()
     
     def register_user(self, username: str, email: str, password: str, role: UserRole = UserRole.USER) -> Tuple[bool, str]:
         """Register a new user"""
@@ -185,7 +407,7 @@ class AuthenticationManager:
             return False, "User already exists"
         
         # Create user
-        user_id = secrets.token_urlsafe(16)
+        user_id = _random_id()
         password_hash = self.encryption.hash_password(password)
         
         user = User(
@@ -212,7 +434,7 @@ class AuthenticationManager:
     
     def authenticate_user(self, username: str, password: str, ip_address: str, user_agent: str) -> Tuple[bool, Optional[str], Optional[str]]:
         """Authenticate user and return access token"""
-        user = self._get_user_by_username(username)
+        user = self._get_auth_slice_by_username(username)
         
         if not user:
             self._log_security_event(
@@ -223,7 +445,7 @@ class AuthenticationManager:
             return False, None, "Invalid credentials"
         
         # Check if account is locked
-        if user.locked_until and datetime.now() < user.locked_until:
+        if user.locked_until and time.time() < user.locked_until:
             self._log_security_event(
                 user.id, "locked_account_access", SecurityLevel.HIGH,
                 f"Access attempt on locked account: {username}",
@@ -233,19 +455,16 @@ class AuthenticationManager:
         
         # Verify password
         if not self.encryption.verify_password(password, user.password_hash):
-            user.failed_login_attempts += 1
+            # Count the failure (and lock if needed) atomically in Redis
+            attempts, _ = self._record_failed_login(user.id)
             
-            # Lock account if too many failed attempts
-            if user.failed_login_attempts >= self.max_login_attempts:
-                user.locked_until = datetime.now() + self.lockout_duration
+            if attempts >= self.max_login_attempts:
                 self._log_security_event(
                     user.id, "account_locked", SecurityLevel.HIGH,
                     f"Account locked due to {self.max_login_attempts} failed login attempts",
                     ip_address, user_agent
                 )
             
-            self._store_user(user)
-            
             self._log_security_event(
                 user.id, "failed_login", SecurityLevel.MEDIUM,
                 f"Failed login attempt for user: {username}",
@@ -262,18 +481,25 @@ class AuthenticationManager:
             )
             return False, None, "Account is inactive"
         
+        # Only the changed fields are written back, not the whole user hash
+        user_fields = {'last_login': int(time.time())}
+        
+        # Upgrade the stored hash if the Argon2 parameters have changed
+        if self.encryption.password_needs_rehash(user.password_hash):
+            user_fields['password_hash'] = self.encryption.hash_password(password)
+        
         # Reset failed attempts on successful login
-        user.failed_login_attempts = 0
-        user.locked_until = None
-        user.last_login = datetime.now()
-        self._store_user(user)
+        with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(f"user:{user.id}", mapping=user_fields)
+            pipe.delete(f"login:{user.id}")
+            pipe.execute()
         
         # Generate tokens
-        access_token = self._generate_access_token(user)
+        access_token, access_payload = self._generate_access_token(user)
         refresh_token = self._generate_refresh_token(user)
         
         # Store session
-        self._store_session(user.id, access_token, refresh_token, ip_address, user_agent)
+        self._store_session(user.id, access_token, access_payload, refresh_token, ip_address, user_agent)
         
         self._log_security_event(
             user.id, "successful_login", SecurityLevel.LOW,
@@ -285,23 +511,67 @@ class AuthenticationManager:
     
     def validate_token(self, token: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
         """Validate JWT token"""
-        try:
-            payload = jwt.decode(token, self.jwt_secret, algorithms=[self.jwt_algorithm])
-            
-            # Check if token is blacklisted
-            if self.redis.sismember("blacklisted_tokens", token):
-                return False, None
-            
-            # Check if session exists
-            session_key = f"session:{payload['user_id']}:{payload['jti']}"
-            if not self.redis.exists(session_key):
-                return False, None
-            
-            return True, payload
-        except jwt.ExpiredSignatureError:
-            return False, None
-        except jwt.InvalidTokenError:
+        token_hash = self._token_hash(token)
+        now = time.time()
+        
+        # Without a live revocation listener the cache could serve revoked tokens,
+        # so it is bypassed until the listener is back
+        listening = self._ensure_revocation_listener()
+        
+        if listening:
+            with self._token_cache_lock:
+                cached = self._token_cache.get(token_hash)
+                if cached is not None:
+                    if cached[0] > now:
+                        self._token_cache.move_to_end(token_hash)
+                        return True, cached[1]
+                    del self._token_cache[token_hash]
+        
+        # Sessions are indexed by the token's SHA-256 and expire with the token,
+        # so a live session means this is an unexpired, unrevoked token we issued
+        payload_data = self.redis.hget(f"session:{token_hash}", 'payload')
+        if not payload_data:
             return False, None
+        
+        payload = json.loads(payload_data)
+        if listening:
+            with self._token_cache_lock:
+                self._token_cache[token_hash] = (min(now + self.token_cache_ttl, payload['exp']), payload)
+                if len(self._token_cache) > self.token_cache_size:
+                    self._token_cache.popitem(last=False)
+        
+        return True, payload
+    
+    def _ensure_revocation_listener(self) -> bool:
+        """Subscribe to token revocations so every process evicts its cached copy; False if not subscribed"""
+        # The listener thread exits on its first connection error
+        if _listener_alive(self._revocation_listener):
+            return True
+        with self._token_cache_lock:
+            if _listener_alive(self._revocation_listener):
+                return True
+            if time.monotonic() < self._revocation_retry_at:
+                return False
+            restarting = self._revocation_listener is not None
+            _stop_listener(self._revocation_listener)
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{'auth:revoke': self._handle_revocation})
+                self._revocation_listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            except redis.RedisError as e:
+                self._revocation_retry_at = time.monotonic() + _LISTENER_RETRY_INTERVAL
+                logger.error(f"Could not subscribe to token revocations: {e}")
+                return False
+            
+            # Revocations published while the old listener was down were missed
+            if restarting:
+                self._token_cache.clear()
+        return True
+    
+    def _handle_revocation(self, message: Dict[str, Any]):
+        """Evict a revoked token from the local cache"""
+        with self._token_cache_lock:
+            self._token_cache.pop(message['data'], None)
     
     def refresh_access_token(self, refresh_token: str) -> Tuple[bool, Optional[str]]:
         """Refresh access token using refresh token"""
@@ -311,12 +581,15 @@ class AuthenticationManager:
             if payload.get('type') != 'refresh':
                 return False, None
             
-            user = self._get_user_by_id(payload['user_id'])
+            if self.redis.exists(self._revoked_key(self._token_hash(refresh_token))):
+                return False, None
+            
+            user = self._get_auth_slice(payload['user_id'])
             if not user or not user.is_active:
                 return False, None
             
             # Generate new access token
-            new_access_token = self._generate_access_token(user)
+            new_access_token, _ = self._generate_access_token(user)
             
             return True, new_access_token
         except jwt.InvalidTokenError:
@@ -324,55 +597,72 @@ class AuthenticationManager:
     
     def logout_user(self, token: str) -> bool:
         """Logout user and invalidate token"""
-        try:
-            payload = jwt.decode(token, self.jwt_secret, algorithms=[self.jwt_algorithm])
-            
-            # Add token to blacklist
-            self.redis.sadd("blacklisted_tokens", token)
-            self.redis.expire("blacklisted_tokens", int(self.access_token_expire.total_seconds()))
-            
-            # Remove session
-            session_key = f"session:{payload['user_id']}:{payload['jti']}"
-            self.redis.delete(session_key)
-            
-            return True
-        except jwt.InvalidTokenError:
+        # A live session already proves the token is ours and unexpired
+        token_hash = self._token_hash(token)
+        session_key = f"session:{token_hash}"
+        refresh_token_hash = self.redis.hget(session_key, 'refresh_token_hash')
+        if refresh_token_hash is None:
             return False
+        
+        with self.redis.pipeline(transaction=True) as pipe:
+            # Removing the session revokes the access token; processes
+            # that cached it are told to drop their copy
+            pipe.delete(session_key)
+            pipe.publish('auth:revoke', token_hash)
+            
+            # Revoke the paired refresh token by hash for the rest of its lifetime
+            pipe.set(self._revoked_key(refresh_token_hash), 1,
+                     ex=int(self.refresh_token_expire.total_seconds()))
+            pipe.execute()
+        
+        with self._token_cache_lock:
+            self._token_cache.pop(token_hash, None)
+        
+        return True
     
     def _validate_username(self, username: str) -> bool:
         """Validate username format"""
         if len(username) < 3 or len(username) > 50:
             return False
-        return re.match(r'^[a-zA-Z0-9_.-]+$', username) is not None
+        return not username.encode().translate(None, _USERNAME_BYTES)
     
     def _validate_email(self, email: str) -> bool:
         """Validate email format"""
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email) is not None
+        # local@host.tld, where tld is at least two letters
+        local, at, domain = email.encode().partition(b'@')
+        host, dot, tld = domain.rpartition(b'.')
+        return bool(
+            local and at and host and len(tld) >= 2
+            and not local.translate(None, _EMAIL_LOCAL_BYTES)
+            and not host.translate(None, _EMAIL_DOMAIN_BYTES)
+            and not tld.translate(None, _ALPHA_BYTES)
+        )
     
     def _validate_password(self, password: str) -> bool:
         """Validate password against security policy"""
         if len(password) < self.min_password_length:
             return False
         
-        if self.require_uppercase and not re.search(r'[A-Z]', password):
-            return False
-        
-        if self.require_lowercase and not re.search(r'[a-z]', password):
-            return False
+        required = ((self.require_uppercase and _PW_UPPER) | (self.require_lowercase and _PW_LOWER) |
+                    (self.require_numbers and _PW_DIGIT) | (self.require_special_chars and _PW_SPECIAL))
         
-        if self.require_numbers and not re.search(r'\d', password):
-            return False
+        # Single pass over the password, OR-ing in each character's class bit
+        found = 0
+        classes = _PASSWORD_CHAR_CLASSES
+        for c in password:
+            flag = classes.get(c)
+            if flag is None:
+                # Non-ASCII decimal digits count as numbers, as with \d
+                flag = _PW_DIGIT if c.isdecimal() else 0
+            found |= flag
+            if found & required == required:
+                return True
         
-        if self.require_special_chars and not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-            return False
-        
-        return True
+        return found & required == required
     
     def _user_exists(self, username: str, email: str) -> bool:
         """Check if user already exists"""
-        return (self.redis.exists(f"user:username:{username}") or 
-                self.redis.exists(f"user:email:{email}"))
+        return self.redis.exists(f"user:username:{username}", f"user:email:{email}") > 0
     
     def _store_user(self, user: User):
         """Store user in Redis"""
@@ -384,20 +674,46 @@ class AuthenticationManager:
             'role': user.role.value,
             'is_active': str(user.is_active),
             'is_verified': str(user.is_verified),
-            'created_at': user.created_at.isoformat(),
-            'last_login': user.last_login.isoformat() if user.last_login else '',
-            'failed_login_attempts': str(user.failed_login_attempts),
-            'locked_until': user.locked_until.isoformat() if user.locked_until else '',
+            'created_at': int(user.created_at.timestamp()),
+            'last_login': int(user.last_login.timestamp()) if user.last_login else '',
             'two_factor_enabled': str(user.two_factor_enabled),
             'two_factor_secret': user.two_factor_secret or ''
         }
         
-        # Store user data
-        self.redis.hset(f"user:{user.id}", mapping=user_data)
-        
-        # Create indexes
-        self.redis.set(f"user:username:{user.username}", user.id)
-        self.redis.set(f"user:email:{user.email}", user.id)
+        with self.redis.pipeline(transaction=True) as pipe:
+            # Store user data
+            pipe.hset(f"user:{user.id}", mapping=user_data)
+            
+            # Create indexes
+            pipe.set(f"user:username:{user.username}", user.id)
+            pipe.set(f"user:email:{user.email}", user.id)
+            pipe.execute()
+    
+    def _record_failed_login(self, user_id: str) -> Tuple[int, int]:
+        """Atomically count a failed login; returns (attempts, locked_until epoch or 0)"""
+        lockout_seconds = int(self.lockout_duration.total_seconds())
+        attempts, locked_until = self._failed_login_script(
+            keys=[f"login:{user_id}"],
+            args=[int(time.time()), self.max_login_attempts, lockout_seconds, lockout_seconds]
+        )
+        return int(attempts), int(locked_until)
+    
+    @staticmethod
+    def _parse_login_state(login_state: Optional[str]) -> Tuple[int, int]:
+        """Unpack an 'attempts:locked_until' counter value"""
+        if not login_state:
+            return 0, 0
+        attempts, locked_until = login_state.split(':')
+        return int(attempts), int(locked_until)
+    
+    @staticmethod
+    def _parse_stored_time(value: str) -> Optional[datetime]:
+        """Epoch seconds from the user hash as a datetime (ISO strings from older records too)"""
+        if not value:
+            return None
+        if value.isdigit():
+            return datetime.fromtimestamp(int(value))
+        return datetime.fromisoformat(value)
     
     def _get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
@@ -406,12 +722,46 @@ class AuthenticationManager:
             return None
         return self._get_user_by_id(user_id)
     
+    def _get_auth_slice_by_username(self, username: str) -> Optional[AuthSlice]:
+        """Get the login fields of a user by username"""
+        user_id = self.redis.get(f"user:username:{username}")
+        if not user_id:
+            return None
+        return self._get_auth_slice(user_id)
+    
+    def _get_auth_slice(self, user_id: str) -> Optional[AuthSlice]:
+        """Get only the fields authenticate_user needs, via HMGET"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hmget(f"user:{user_id}", 'username', 'role', 'password_hash', 'is_active')
+        pipe.get(f"login:{user_id}")
+        (username, role, password_hash, is_active), login_state = pipe.execute()
+        if password_hash is None:
+            return None
+        
+        failed_login_attempts, locked_until = self._parse_login_state(login_state)
+        
+        return AuthSlice(
+            id=user_id,
+            username=username,
+            role=UserRole(role),
+            password_hash=password_hash,
+            is_active=is_active.lower() == 'true',
+            failed_login_attempts=failed_login_attempts,
+            locked_until=locked_until
+        )
+    
     def _get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
-        user_data = self.redis.hgetall(f"user:{user_id}")
+        # Volatile lockout state lives in its own packed counter key
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(f"user:{user_id}")
+        pipe.get(f"login:{user_id}")
+        user_data, login_state = pipe.execute()
         if not user_data:
             return None
         
+        failed_login_attempts, locked_until = self._parse_login_state(login_state)
+        
         return User(
             id=user_data['id'],
             username=user_data['username'],
@@ -420,60 +770,75 @@ class AuthenticationManager:
             role=UserRole(user_data['role']),
             is_active=user_data['is_active'].lower() == 'true',
             is_verified=user_data['is_verified'].lower() == 'true',
-            created_at=datetime.fromisoformat(user_data['created_at']),
-            last_login=datetime.fromisoformat(user_data['last_login']) if user_data['last_login'] else None,
-            failed_login_attempts=int(user_data['failed_login_attempts']),
-            locked_until=datetime.fromisoformat(user_data['locked_until']) if user_data['locked_until'] else None,
+            created_at=self._parse_stored_time(user_data['created_at']),
+            last_login=self._parse_stored_time(user_data['last_login']),
+            failed_login_attempts=failed_login_attempts,
+            locked_until=datetime.fromtimestamp(locked_until) if locked_until else None,
             two_factor_enabled=user_data['two_factor_enabled'].lower() == 'true',
             two_factor_secret=user_data['two_factor_secret'] if user_data['two_factor_secret'] else None
         )
     
-    def _generate_access_token(self, user: User) -> str:
-        """Generate JWT access token"""
+    def _generate_access_token(self, user: Union[User, AuthSlice]) -> Tuple[str, Dict[str, Any]]:
+        """Generate JWT access token; returns the token and its payload"""
+        now = int(time.time())
         payload = {
             'user_id': user.id,
             'username': user.username,
             'role': user.role.value,
             'type': 'access',
-            'exp': datetime.utcnow() + self.access_token_expire,
-            'iat': datetime.utcnow(),
-            'jti': secrets.token_urlsafe(16)
+            'exp': now + int(self.access_token_expire.total_seconds()),
+            'iat': now,
+            'jti': _random_id()
         }
-        return jwt.encode(payload, self.jwt_secret, algorithm=self.jwt_algorithm)
+        return jwt.encode(payload, self.jwt_secret, algorithm=self.jwt_algorithm), payload
     
-    def _generate_refresh_token(self, user: User) -> str:
+    def _generate_refresh_token(self, user: Union[User, AuthSlice]) -> str:
         """Generate JWT refresh token"""
         payload = {
             'user_id': user.id,
             'type': 'refresh',
             'exp': datetime.utcnow() + self.refresh_token_expire,
             'iat': datetime.utcnow(),
-            'jti': secrets.token_urlsafe(16)
+            'jti': _random_id()
         }
         return jwt.encode(payload, self.jwt_secret, algorithm=self.jwt_algorithm)
     
-    def _store_session(self, user_id: str, access_token: str, refresh_token: str, ip_address: str, user_agent: str):
+    def _store_session(self, user_id: str, access_token: str, access_payload: Dict[str, Any],
+                       refresh_token: str, ip_address: str, user_agent: str):
         """Store user session"""
-        access_payload = jwt.decode(access_token, self.jwt_secret, algorithms=[self.jwt_algorithm])
-        
+        # Only token hashes are stored, so a leaked session store cannot be replayed
         session_data = {
             'user_id': user_id,
-            'access_token': access_token,
-            'refresh_token': refresh_token,
+            'payload': json.dumps(access_payload),
+            'refresh_token_hash': self._token_hash(refresh_token),
             'ip_address': ip_address,
             'user_agent': user_agent,
-            'created_at': datetime.now().isoformat()
+            'created_at': int(time.time())
         }
         
-        session_key = f"session:{user_id}:{access_payload['jti']}"
-        self.redis.hset(session_key, mapping=session_data)
-        self.redis.expire(session_key, int(self.refresh_token_expire.total_seconds()))
+        session_key = self._session_key(access_token)
+        with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(session_key, mapping=session_data)
+            pipe.expireat(session_key, access_payload['exp'])
+            pipe.execute()
+    
+    def _token_hash(self, token: str) -> str:
+        """SHA-256 of a token as hex"""
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    def _session_key(self, token: str) -> str:
+        """Redis key of the session for a token, indexed by the token's SHA-256"""
+        return f"session:{self._token_hash(token)}"
+    
+    def _revoked_key(self, token_hash: str) -> str:
+        """Redis key marking a token as revoked (128-bit hash prefix)"""
+        return f"revoked:{token_hash[:32]}"
     
     def _log_security_event(self, user_id: str, event_type: str, severity: SecurityLevel, 
                            description: str, ip_address: str, user_agent: str, metadata: Dict[str, Any] = None):
         """Log security event"""
         event = SecurityEvent(
-            id=secrets.token_urlsafe(16),
+            id=_random_id(),
             user_id=user_id,
             event_type=event_type,
             severity=severity,
@@ -484,78 +849,242 @@ class AuthenticationManager:
             metadata=metadata or {}
         )
         
-        event_data = {
-            'id': event.id,
-            'user_id': event.user_id,
-            'event_type': event.event_type,
-            'severity': event.severity.value,
-            'description': event.description,
-            'ip_address': event.ip_address,
-            'user_agent': event.user_agent,
-            'timestamp': event.timestamp.isoformat(),
-            'metadata': json.dumps(event.metadata)
-        }
-        
-        # Store security event
-        self.redis.lpush("security_events", json.dumps(event_data))
-        self.redis.ltrim("security_events", 0, 9999)  # Keep last 10000 events
+        # Queue security event for the batched writer; orjson encodes the
+        # dataclass, enum, datetime and metadata dict in a single pass
+        self._ensure_event_flusher()
+        try:
+            self._event_queue.put_nowait(orjson.dumps(event))
+        except queue.Full:
+            self._write_security_events([orjson.dumps(event)])
         
         # Alert on high severity events
         if severity in [SecurityLevel.HIGH, SecurityLevel.CRITICAL]:
             self._send_security_alert(event)
     
+    def _ensure_event_flusher(self):
+        """Start the background security event writer on first use"""
+        if self._event_flusher is not None:
+            return
+        with self._event_flusher_lock:
+            if self._event_flusher is None:
+                self._event_flusher = threading.Thread(
+                    target=self._flush_events_loop, name='security-event-flusher', daemon=True
+                )
+                self._event_flusher.start()
+                atexit.register(self.flush_security_events)
+    
+    def _flush_events_loop(self):
+        """Collect queued events for up to one flush interval and write them together"""
+        while True:
+            batch = [self._event_queue.get()]
+            deadline = time.monotonic() + self.event_flush_interval
+            while len(batch) < self.event_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._event_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write_security_events(batch)
+    
+    def flush_security_events(self):
+        """Write any buffered security events immediately"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._event_queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write_security_events(batch)
+    
+    def _write_security_events(self, events: List[bytes]):
+        """Push events (oldest first) and trim the log in one round-trip"""
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.lpush("security_events", *events)
+            pipe.ltrim("security_events", 0, 9999)  # Keep last 10000 events
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Failed to write {len(events)} security events: {e}")
+    
     def _send_security_alert(self, event: SecurityEvent):
         """Send security alert for high severity events"""
         # This would integrate with alerting systems (email, Slack, etc.)
         logger.warning(f"SECURITY ALERT: {event.description} - User: {event.user_id}, IP: {event.ip_address}")
 
+# Default permissions granted to each role
+DEFAULT_ROLE_PERMISSIONS = {
+    UserRole.ADMIN: [
+        'user:create', 'user:read', 'user:update', 'user:delete',
+        'workflow:create', 'workflow:read', 'workflow:update', 'workflow:delete',
+        'task:create', 'task:read', 'task:update', 'task:delete',
+        'system:configure', 'system:monitor', 'security:manage'
+    ],
+    UserRole.USER: [
+        'user:read_own', 'user:update_own',
+        'workflow:create', 'workflow:read_own', 'workflow:update_own', 'workflow:delete_own',
+        'task:create', 'task:read_own', 'task:update_own', 'task:delete_own'
+    ],
+    UserRole.GUEST: [
+        'user:read_own',
+        'workflow:read_own',
+        'task:read_own'
+    ],
+    UserRole.SERVICE: [
+        'workflow:execute', 'task:execute', 'system:monitor'
+    ]
+}
+
+# Stable bit per default permission; the same in every process
+PERMISSION_BITS = {
+    perm: 1 << i
+    for i, perm in enumerate(sorted({p for perms in DEFAULT_ROLE_PERMISSIONS.values() for p in perms}))
+}
+
 class AuthorizationManager:
     """Handles role-based access control and permissions"""
     
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
+        
+        # Each role's permissions as an int bitmask, so a check is one AND.
+        # role_permissions:* in Redis stays the source of truth; the masks are
+        # kept in sync across processes via the perms:invalidate channel
+        self._bits: Dict[str, int] = dict(PERMISSION_BITS)
+        self._masks: Dict[UserRole, int] = {}
+        self._perms_lock = threading.Lock()
+        self._invalidation_listener = None
+        self._invalidation_retry_at = 0.0
+        
         self._setup_default_permissions()
     
     def _setup_default_permissions(self):
         """Setup default role permissions"""
-        permissions = {
-            UserRole.ADMIN: [
-                'user:create', 'user:read', 'user:update', 'user:delete',
-                'workflow:create', 'workflow:read', 'workflow:update', 'workflow:delete',
-                'task:create', 'task:read', 'task:update', 'task:delete',
-                'system:configure', 'system:monitor', 'security:manage'
-            ],
-            UserRole.USER: [
-                'user:read_own', 'user:update_own',
-                'workflow:create', 'workflow:read_own', 'workflow:update_own', 'workflow:delete_own',
-                'task:create', 'task:read_own', 'task:update_own', 'task:delete_own'
-            ],
-            UserRole.GUEST: [
-                'user:read_own',
-                'workflow:read_own',
-                'task:read_own'
-            ],
-            UserRole.SERVICE: [
-                'workflow:execute', 'task:execute', 'system:monitor'
-            ]
-        }
-        
-        for role, perms in permissions.items():
+        for role, perms in DEFAULT_ROLE_PERMISSIONS.items():
             self.redis.delete(f"role_permissions:{role.value}")
             for perm in perms:
                 self.redis.sadd(f"role_permissions:{role.value}", perm)
+            self._masks[role] = self.permissions_mask(perms)
+    
+    def permission_bit(self, permission: str) -> int:
+        """Bit for a permission; permissions added at runtime get the next free bit"""
+        bit = self._bits.get(permission)
+        if bit is None:
+            with self._perms_lock:
+                bit = self._bits.setdefault(permission, 1 << len(self._bits))
+        return bit
+    
+    def permissions_mask(self, permissions) -> int:
+        """OR of the bits of several permissions"""
+        mask = 0
+        for permission in permissions:
+            mask |= self.permission_bit(permission)
+        return mask
+    
+    def role_mask(self, role: UserRole) -> int:
+        """Bitmask of everything a role is allowed to do"""
+        self._ensure_invalidation_listener()
+        return self._masks.get(role, 0)
     
     def check_permission(self, user_role: UserRole, permission: str) -> bool:
         """Check if user role has specific permission"""
-        return self.redis.sismember(f"role_permissions:{user_role.value}", permission)
+        return bool(self.role_mask(user_role) & self.permission_bit(permission))
+    
+    def get_user_role(self, user_id: str) -> Optional[UserRole]:
+        """Role stored on a user's record, None for unknown users"""
+        role = self.redis.hget(f"user:{user_id}", 'role')
+        return UserRole(role) if role else None
+    
+    def get_user_permissions(self, user_id: str) -> Set[str]:
+        """Names of every permission a user's role grants"""
+        role = self.get_user_role(user_id)
+        if role is None:
+            return set()
+        mask = self.role_mask(role)
+        return {permission for permission, bit in self._bits.items() if mask & bit}
     
     def add_permission(self, role: UserRole, permission: str) -> bool:
         """Add permission to role"""
-        return self.redis.sadd(f"role_permissions:{role.value}", permission) > 0
+        added = self.redis.sadd(f"role_permissions:{role.value}", permission) > 0
+        if added:
+            self._invalidate(role)
+        return added
     
     def remove_permission(self, role: UserRole, permission: str) -> bool:
         """Remove permission from role"""
-        return self.redis.srem(f"role_permissions:{role.value}", permission) > 0
+        removed = self.redis.srem(f"role_permissions:{role.value}", permission) > 0
+        if removed:
+            self._invalidate(role)
+        return removed
+    
+    def _invalidate(self, role: UserRole):
+        """Reload a role locally and tell sibling processes to do the same"""
+        self._reload_role(role)
+        self.redis.publish('perms:invalidate', role.value)
+    
+    def _reload_role(self, role: UserRole):
+        """Rebuild the cached mask of a role from Redis"""
+        mask = self.permissions_mask(self.redis.smembers(f"role_permissions:{role.value}"))
+        with self._perms_lock:
+            self._masks[role] = mask
+    
+    def _ensure_invalidation_listener(self):
+        """Subscribe to permission changes made by other processes, resubscribing if the listener died"""
+        # The listener thread exits on its first connection error
+        if _listener_alive(self._invalidation_listener):
+            return
+        with self._perms_lock:
+            if _listener_alive(self._invalidation_listener) or time.monotonic() < self._invalidation_retry_at:
+                return
+            _stop_listener(self._invalidation_listener)
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{'perms:invalidate': self._handle_invalidation})
+                self._invalidation_listener = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            except redis.RedisError as e:
+                self._invalidation_retry_at = time.monotonic() + _LISTENER_RETRY_INTERVAL
+                logger.error(f"Could not subscribe to permission changes: {e}")
+                return
+        
+        # Pick up anything changed before the subscription existed or while it was down
+        try:
+            for role in UserRole:
+                self._reload_role(role)
+        except redis.RedisError as e:
+            # Drop the subscription so the reload is retried along with it
+            logger.error(f"Error reloading permissions: {str(e)}")
+            with self._perms_lock:
+                self._invalidation_retry_at = time.monotonic() + _LISTENER_RETRY_INTERVAL
+                _stop_listener(self._invalidation_listener)
+                self._invalidation_listener = None
+    
+    def _handle_invalidation(self, message: Dict[str, Any]):
+        """Reload the role named in an invalidation message"""
+        try:
+            self._reload_role(UserRole(message['data']))
+        except (ValueError, redis.RedisError) as e:
+            logger.error(f"Error reloading permissions: {str(e)}")
+
+@lru_cache(maxsize=65536)
+def _parse_ip(ip_address: str) -> Optional[Tuple[int, int]]:
+    """Parse an IP string once into (version, integer value); None if invalid"""
+    try:
+        ip = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return None
+    return ip.version, int(ip)
+
+_COUNT_REQUEST_LUA = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+local rate = redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return {count, rate}
+"""
 
 class SecurityMonitor:
     """Monitors system for security threats and anomalies"""
@@ -563,6 +1092,21 @@ class SecurityMonitor:
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
         self.threat_patterns = self._load_threat_patterns()
+        
+        # Brute-force window counter and per-minute access counter, both
+        # updated by one script call per request
+        self._count_request = self.redis.register_script(_COUNT_REQUEST_LUA)
+        
+        # Bad addresses and CIDR blocks, grouped by (version, prefix length) so a
+        # lookup is one mask-and-probe per distinct prefix length
+        self._bad_networks: Dict[Tuple[int, int], set] = {}
+        for network in self.threat_patterns['suspicious_ip']['known_bad_ips']:
+            self.add_bad_network(network)
+    
+    def add_bad_network(self, network: str):
+        """Flag an address or CIDR block (e.g. from a threat feed) as suspicious"""
+        net = ipaddress.ip_network(network, strict=False)
+        self._bad_networks.setdefault((net.version, net.prefixlen), set()).add(int(net.network_address))
     
     def _load_threat_patterns(self) -> Dict[str, Any]:
         """Load threat detection patterns"""
@@ -584,85 +1128,72 @@ class SecurityMonitor:
     
     def analyze_request(self, ip_address: str, user_agent: str, endpoint: str, user_id: str = None) -> List[SecurityEvent]:
         """Analyze incoming request for security threats"""
-        threats = []
-        
-        # Check for brute force attacks
-        if self._detect_brute_force(ip_address):
-            threats.append(self._create_threat_event(
-                'brute_force_detected', SecurityLevel.HIGH,
-                f"Brute force attack detected from IP: {ip_address}",
-                ip_address, user_agent, user_id
-            ))
-        
-        # Check for suspicious IP addresses
-        if self._is_suspicious_ip(ip_address):
-            threats.append(self._create_threat_event(
-                'suspicious_ip', SecurityLevel.MEDIUM,
-                f"Request from suspicious IP: {ip_address}",
-                ip_address, user_agent, user_id
-            ))
-        
-        # Check for unusual access patterns
-        if self._detect_unusual_access(ip_address):
-            threats.append(self._create_threat_event(
-                'unusual_access_pattern', SecurityLevel.MEDIUM,
-                f"Unusual access pattern detected from IP: {ip_address}",
-                ip_address, user_agent, user_id
-            ))
-        
-        return threats
+        return self.analyze_batch([(ip_address, user_agent, endpoint, user_id, time.time())])
     
-    def _detect_brute_force(self, ip_address: str) -> bool:
-        """Detect brute force attacks"""
-        key = f"requests:{ip_address}"
-        current_time = int(time.time())
-        window_start = current_time - self.threat_patterns['brute_force']['time_window']
+    def analyze_batch(self, requests: List[Tuple[str, str, str, Optional[str], float]]) -> List[SecurityEvent]:
+        """Analyze a batch of (ip, user_agent, endpoint, user_id, timestamp) requests in one Redis round-trip"""
+        window = self.threat_patterns['brute_force']['time_window']
         
-        # Remove old entries
-        self.redis.zremrangebyscore(key, 0, window_start)
+        pipe = self.redis.pipeline(transaction=False)
+        for ip_address, _, _, _, timestamp in requests:
+            # Access rate counters are kept for 5 minutes
+            self._count_request(
+                keys=[f"requests:{ip_address}:{int(timestamp) // window}", f"access_rate:{ip_address}"],
+                args=[window, int(timestamp / 60), 300],
+                client=pipe
+            )
+        results = pipe.execute()
+        
+        max_attempts = self.threat_patterns['brute_force']['max_attempts']
+        max_per_minute = self.threat_patterns['unusual_access_pattern']['max_requests_per_minute']
         
-        # Add current request
-        self.redis.zadd(key, {str(current_time): current_time})
-        self.redis.expire(key, self.threat_patterns['brute_force']['time_window'])
+        threats = []
+        for i, (ip_address, user_agent, _, user_id, _) in enumerate(requests):
+            request_count, access_count = results[i]
+            
+            if request_count > max_attempts:
+                threats.append(self._create_threat_event(
+                    'brute_force_detected', SecurityLevel.HIGH,
+                    f"Brute force attack detected from IP: {ip_address}",
+                    ip_address, user_agent, user_id
+                ))
+            
+            if self._is_suspicious_ip(ip_address):
+                threats.append(self._create_threat_event(
+                    'suspicious_ip', SecurityLevel.MEDIUM,
+                    f"Request from suspicious IP: {ip_address}",
+                    ip_address, user_agent, user_id
+                ))
+            
+            if access_count > max_per_minute:
+                threats.append(self._create_threat_event(
+                    'unusual_access_pattern', SecurityLevel.MEDIUM,
+                    f"Unusual access pattern detected from IP: {ip_address}",
+                    ip_address, user_agent, user_id
+                ))
         
-        # Check if threshold exceeded
-        request_count = self.redis.zcard(key)
-        return request_count > self.threat_patterns['brute_force']['max_attempts']
+        return threats
     
     def _is_suspicious_ip(self, ip_address: str) -> bool:
         """Check if IP address is suspicious"""
-        # Check against known bad IPs
-        if ip_address in self.threat_patterns['suspicious_ip']['known_bad_ips']:
-            return True
-        
-        # Check if IP is in private ranges (could be suspicious for external access)
-        try:
-            ip = ipaddress.ip_address(ip_address)
-            if ip.is_private and not ip.is_loopback:
-                return False  # Private IPs are generally OK
-        except ValueError:
+        parsed = _parse_ip(ip_address)
+        if parsed is None:
             return True  # Invalid IP format is suspicious
         
-        return False
-    
-    def _detect_unusual_access(self, ip_address: str) -> bool:
-        """Detect unusual access patterns"""
-        key = f"access_rate:{ip_address}"
-        current_minute = int(time.time() / 60)
-        
-        # Increment counter for current minute
-        self.redis.hincrby(key, str(current_minute), 1)
-        self.redis.expire(key, 300)  # Keep for 5 minutes
+        # Check against known bad addresses and networks
+        version, value = parsed
+        bits = 32 if version == 4 else 128
+        for (net_version, prefixlen), networks in self._bad_networks.items():
+            if net_version == version and (value >> (bits - prefixlen)) << (bits - prefixlen) in networks:
+                return True
         
-        # Check current minute's request count
-        current_count = int(self.redis.hget(key, str(current_minute)) or 0)
-        return current_count > self.threat_patterns['unusual_access_pattern']['max_requests_per_minute']
+        return False
     
     def _create_threat_event(self, event_type: str, severity: SecurityLevel, description: str,
                            ip_address: str, user_agent: str, user_id: str = None) -> SecurityEvent:
         """Create security threat event"""
         return SecurityEvent(
-            id=secrets.token_urlsafe(16),
+            id=_random_id(),
             user_id=user_id or "",
             event_type=event_type,
             severity=severity,
@@ -673,24 +1204,71 @@ class SecurityMonitor:
             metadata={}
         )
 
-# Global security manager instances
+# Global security manager instances, built on first use rather than at import
+# (Argon2 calibration, Redis writes and background threads stay out of the
+# import path and out of a preforking master process)
 redis_client = redis.Redis(host='localhost', port=6379, db=4, decode_responses=True)
-encryption_manager = EncryptionManager()
-auth_manager = AuthenticationManager(redis_client, encryption_manager)
-authz_manager = AuthorizationManager(redis_client)
-security_monitor = SecurityMonitor(redis_client)
+
+@lru_cache(maxsize=1)
+def get_encryption_manager() -> EncryptionManager:
+    """Process-wide EncryptionManager"""
+    return EncryptionManager(redis_client=redis_client)
+
+@lru_cache(maxsize=1)
+def get_auth_manager() -> AuthenticationManager:
+    """Process-wide AuthenticationManager"""
+    return AuthenticationManager(redis_client, get_encryption_manager())
+
+@lru_cache(maxsize=1)
+def get_authz_manager() -> AuthorizationManager:
+    """Process-wide AuthorizationManager"""
+    return AuthorizationManager(redis_client)
+
+@lru_cache(maxsize=1)
+def get_security_monitor() -> SecurityMonitor:
+    """Process-wide SecurityMonitor"""
+    return SecurityMonitor(redis_client)
+
+# `from security_manager import auth_manager` etc. keep working through these
+_LAZY_GLOBALS = {
+    'encryption_manager': get_encryption_manager,
+    'auth_manager': get_auth_manager,
+    'authz_manager': get_authz_manager,
+    'security_monitor': get_security_monitor,
+}
+
+def __getattr__(name: str):
+    """Resolve the lazily built manager globals"""
+    getter = _LAZY_GLOBALS.get(name)
+    if getter is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getter()
 
 # Create a unified security manager
 class SecurityManager:
-    def __init__(self):
-        self.encryption = encryption_manager
-        self.auth = auth_manager
-        self.authz = authz_manager
-        self.monitor = security_monitor
+    @property
+    def encryption(self) -> EncryptionManager:
+        return get_encryption_manager()
+    
+    @property
+    def auth(self) -> AuthenticationManager:
+        return get_auth_manager()
+    
+    @property
+    def authz(self) -> AuthorizationManager:
+        return get_authz_manager()
+    
+    @property
+    def monitor(self) -> SecurityMonitor:
+        return get_security_monitor()
     
     def get_user_permissions(self, user_id: str):
         """Get user permissions"""
         return self.authz.get_user_permissions(user_id)
+    
+    def get_user_role(self, user_id: str) -> Optional[UserRole]:
+        """Get user role"""
+        return self.authz.get_user_role(user_id)
 
 security_manager = SecurityManager()
 
@@ -707,7 +1285,7 @@ def require_auth(f):
             return jsonify({'error': 'Authentication required'}), 401
         
         token = auth_header.split(' ')[1]
-        user_data = auth_manager.verify_token(token)
+        user_data = get_auth_manager().verify_token(token)
         
         if not user_data:
             return jsonify({'error': 'Invalid token'}), 401
@@ -726,7 +1304,7 @@ def require_permission(permission: str):
             if not hasattr(request, 'user_id'):
                 return jsonify({'error': 'Authentication required'}), 401
             
-            user_permissions = authz_manager.get_user_permissions(request.user_id)
+            user_permissions = get_authz_manager().get_user_permissions(request.user_id)
             if permission not in user_permissions:
                 return jsonify({'error': 'Insufficient permissions'}), 403
             
@@ -736,6 +1314,28 @@ def require_permission(permission: str):
 
 def initialize_security():
     """Initialize security system"""
+    # Build the managers now so the first request doesn't pay for it
+    for getter in _LAZY_GLOBALS.values():
+        getter()
+    
+    # HS256 JWTs are signed via hmac/hashlib; make sure that path is OpenSSL-backed
+    # (and therefore uses SHA extensions where the CPU has them)
+    if hashlib.sha256.__name__.startswith('openssl_'):
+        logger.info(f"SHA-256 backend: {ssl.OPENSSL_VERSION}")
+    else:
+        logger.warning("hashlib is not linked against OpenSSL; SHA-256/HMAC will use the slow builtin implementation")
+    
+    # Argon2 runs in libargon2 via argon2-cffi-bindings; its x86_64 wheels are
+    # built with the SSE2 optimized core, other platforms may fall back to ref.c
+    ph = get_encryption_manager()._ph
+    try:
+        bindings_version = importlib.metadata.version('argon2-cffi-bindings')
+    except importlib.metadata.PackageNotFoundError:
+        bindings_version = 'unknown'
+    logger.info(
+        f"Argon2 backend: argon2-cffi-bindings {bindings_version} on {platform.machine()} "
+        f"(t={ph.time_cost}, m={ph.memory_cost} KiB, p={ph.parallelism})"
+    )
     logger.info("Security system initialized")
 
 if __name__ == '__main__':
@@ -11,6 +11,7 @@ import signal
 import subprocess
 import logging
 from multiprocessing import Process
+from multiprocessing.connection import wait
 import redis
 
 # Configure logging
@@ -20,60 +21,144 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+APP_DIR = '/home/ubuntu/personal_ai_assistant'
+
+class ManagedCommand:
+    """External command with the is_alive/terminate/join interface of multiprocessing.Process"""
+    
+    def __init__(self, name: str, args: list, cwd: str):
+        self.name = name
+        # Own session so terminal signals reach us first and we stop it explicitly
+        self.popen = subprocess.Popen(args, cwd=cwd, start_new_session=True)
+        self.pid = self.popen.pid
+        # Becomes readable when the process exits, like Process.sentinel
+        self.sentinel = os.pidfd_open(self.pid)
+    
+    def is_alive(self) -> bool:
+        return self.popen.poll() is None
+    
+    def terminate(self):
+        self.popen.terminate()
+    
+    def kill(self):
+        self.popen.kill()
+    
+    def join(self, timeout=None):
+        try:
+            self.popen.wait(timeout)
+        except subprocess.TimeoutExpired:
+            pass
+    
+    def close(self):
+        os.close(self.sentinel)
+
 class BackgroundServiceManager:
     """Manages all background services for the AI Assistant"""
     
     def __init__(self):
-        self.processes = []
+        self.processes = {}  # sentinel -> process
         self.running = False
+        self.venv_python = os.path.join(APP_DIR, 'venv', 'bin', 'python')
+        self.redis_client = redis.Redis(host='localhost', port=6379, db=0, socket_connect_timeout=0.5)
         
+        # Process name -> start method, used to restart a service that died
+        self._starters = {
+            "celery_worker": self.start_celery_worker,
+            "celery_beat": self.start_celery_beat,
+            "event_system": self.start_event_system,
+            "scheduler": self.start_scheduler
+        }
+        
+        # Restart backoff: process name -> last start time, current delay, and when
+        # a pending restart is due. A service that dies within
+        # restart_stable_uptime waits twice as long as last time, up to the cap
+        self.restart_backoff_initial = 1.0
+        self.restart_backoff_max = 300.0
+        self.restart_stable_uptime = 30.0
+        self._started_at = {}
+        self._restart_delay = {}
+        self._restart_due = {}
+        
+        # Last Redis ping outcome, reused for a few seconds: [checked_at, ok]
+        self.redis_status_ttl = 5.0
+        self._redis_status = [float('-inf'), False]
+        
+    def _redis_up(self) -> bool:
+        """Ping Redis once"""
+        try:
+            return self.redis_client.ping()
+        except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError):
+            return False
+    
+    def _track(self, process):
+        """Register a started process for monitoring"""
+        self.processes[process.sentinel] = process
+        self._started_at[process.name] = time.monotonic()
+    
+    def _schedule_restart(self, name: str):
+        """Restart a service now, or later if it keeps dying right after starting"""
+        now = time.monotonic()
+        if now - self._started_at.get(name, float('-inf')) >= self.restart_stable_uptime:
+            self._restart_delay.pop(name, None)
+            self._starters[name]()
+            return
+        
+        delay = self._restart_delay.get(name)
+        delay = self.restart_backoff_initial if delay is None else min(delay * 2, self.restart_backoff_max)
+        self._restart_delay[name] = delay
+        self._restart_due[name] = now + delay
+        logger.warning(f"{name} exited shortly after starting, restarting in {delay:.0f}s")
+    
     def start_redis_server(self):
         """Start Redis server if not running"""
-        try:
-            # Check if Redis is already running
-            redis_client = redis.Redis(host='localhost', port=6379, db=0)
-            redis_client.ping()
+        # Check if Redis is already running
+        if self._redis_up():
             logger.info("Redis server is already running")
             return True
-        except:
-            logger.info("Starting Redis server...")
-            try:
-                # Try to start Redis server
-                redis_process = subprocess.Popen(
-                    ['redis-server', '--daemonize', 'yes'],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                time.sleep(2)  # Give Redis time to start
-                
-                # Verify Redis is running
-                redis_client = redis.Redis(host='localhost', port=6379, db=0)
-                redis_client.ping()
+        
+        logger.info("Starting Redis server...")
+        try:
+            subprocess.Popen(
+                ['redis-server', '--daemonize', 'yes'],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+        except OSError as e:
+            logger.error(f"Failed to start Redis server: {str(e)}")
+            return False
+        
+        # Wait until Redis accepts connections, backing off between pings
+        deadline = time.monotonic() + 5.0
+        delay = 0.02
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            if self._redis_up():
                 logger.info("Redis server started successfully")
                 return True
-            except Exception as e:
-                logger.error(f"Failed to start Redis server: {str(e)}")
-                return False
+            delay = min(delay * 1.6, 0.25)
+        
+        logger.error("Failed to start Redis server: not accepting connections after 5s")
+        return False
     
     def start_celery_worker(self):
         """Start Celery worker process"""
-        def run_celery():
-            os.system('cd /home/ubuntu/personal_ai_assistant && source venv/bin/activate && celery -A background_worker worker --loglevel=info')
-        
-        process = Process(target=run_celery, name="celery_worker")
-        process.start()
-        self.processes.append(process)
+        process = ManagedCommand(
+            "celery_worker",
+            [self.venv_python, '-m', 'celery', '-A', 'background_worker', 'worker', '--loglevel=info'],
+            cwd=APP_DIR
+        )
+        self._track(process)
         logger.info("Started Celery worker")
         return process
     
     def start_celery_beat(self):
         """Start Celery beat scheduler"""
-        def run_celery_beat():
-            os.system('cd /home/ubuntu/personal_ai_assistant && source venv/bin/activate && celery -A background_worker beat --loglevel=info')
-        
-        process = Process(target=run_celery_beat, name="celery_beat")
-        process.start()
-        self.processes.append(process)
+        process = ManagedCommand(
+            "celery_beat",
+            [self.venv_python, '-m', 'celery', '-A', 'background_worker', 'beat', '--loglevel=info'],
+            cwd=APP_DIR
+        )
+        self._track(process)
         logger.info("Started Celery beat scheduler")
         return process
     
@@ -85,7 +170,7 @@ class BackgroundServiceManager:
         
         process = Process(target=run_event_system, name="event_system")
         process.start()
-        self.processes.append(process)
+        self._track(process)
         logger.info("Started event system")
         return process
     
@@ -97,7 +182,7 @@ class BackgroundServiceManager:
         
         process = Process(target=run_scheduler, name="scheduler")
         process.start()
-        self.processes.append(process)
+        self._track(process)
         logger.info("Started APScheduler")
         return process
     
@@ -112,17 +197,12 @@ class BackgroundServiceManager:
         
         # Start all other services
         try:
+            # Services coordinate through Redis, which is already up,
+            # so they don't need to wait for each other
             self.start_celery_worker()
-            time.sleep(2)  # Give worker time to start
-            
             self.start_celery_beat()
-            time.sleep(2)
-            
             self.start_event_system()
-            time.sleep(2)
-            
             self.start_scheduler()
-            time.sleep(2)
             
             self.running = True
             logger.info("All background services started successfully")
@@ -140,7 +220,7 @@ class BackgroundServiceManager:
         self.running = False
         
         # Terminate all processes
-        for process in self.processes:
+        for process in self.processes.values():
             try:
                 if process.is_alive():
                     logger.info(f"Terminating {process.name}")
@@ -161,34 +241,31 @@ class BackgroundServiceManager:
         """Monitor running services and restart if needed"""
         while self.running:
             try:
-                # Check if all processes are still alive
-                dead_processes = []
-                for process in self.processes:
-                    if not process.is_alive():
-                        dead_processes.append(process)
-                
-                # Restart dead processes
-                for process in dead_processes:
+                # Block until a service exits or a delayed restart is due, instead of polling
+                timeout = 60.0
+                if self._restart_due:
+                    timeout = max(0.0, min(min(self._restart_due.values()) - time.monotonic(), timeout))
+                for sentinel in wait(list(self.processes), timeout=timeout):
+                    process = self.processes.pop(sentinel)
                     logger.warning(f"Process {process.name} died, restarting...")
-                    self.processes.remove(process)
-                    
-                    if process.name == "celery_worker":
-                        self.start_celery_worker()
-                    elif process.name == "celery_beat":
-                        self.start_celery_beat()
-                    elif process.name == "event_system":
-                        self.start_event_system()
-                    elif process.name == "scheduler":
-                        self.start_scheduler()
+                    process.join()
+                    process.close()
+                    self._schedule_restart(process.name)
                 
-                time.sleep(10)  # Check every 10 seconds
+                now = time.monotonic()
+                for name, due in list(self._restart_due.items()):
+                    if due <= now:
+                        del self._restart_due[name]
+                        self._starters[name]()
                 
+            except InterruptedError:
+                continue
             except Exception as e:
                 logger.error(f"Error monitoring services: {str(e)}")
                 time.sleep(10)
     
-    def get_service_status(self):
-        """Get status of all services"""
+    def get_service_status(self, force: bool = False):
+        """Get status of all services (force skips the cached Redis ping)"""
         status = {
             'redis': False,
             'celery_worker': False,
@@ -198,15 +275,14 @@ class BackgroundServiceManager:
         }
         
         # Check Redis
-        try:
-            redis_client = redis.Redis(host='localhost', port=6379, db=0)
-            redis_client.ping()
-            status['redis'] = True
-        except:
-            pass
+        now = time.monotonic()
+        if force or now - self._redis_status[0] >= self.redis_status_ttl:
+            self._redis_status[1] = self._redis_up()
+            self._redis_status[0] = now
+        status['redis'] = self._redis_status[1]
         
         # Check other processes
-        for process in self.processes:
+        for process in self.processes.values():
             if process.is_alive():
                 status[process.name] = True
         
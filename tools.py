@@ -1,5 +1,6 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from personal_ai_assistant.app_connector import AppConnector
 
 from google.oauth2.credentials import Credentials
@@ -9,11 +10,21 @@ from googleapiclient.discovery import build
 from email.mime.text import MIMEText
 import base64
 import os
+import threading
 
 # Khởi tạo AppConnector. Đảm bảo đường dẫn đến config.json là chính xác.
 # Giả sử config.json nằm ở thư mục gốc của dự án (personal_ai_assistant)
 app_connector = AppConnector(config_file="personal_ai_assistant/config.json")
 
+# Session dùng chung để tái sử dụng kết nối TCP/TLS tới Make.com giữa các lần gọi.
+# Retry mặc định không lặp lại POST khi đã gửi yêu cầu, chỉ khi kết nối thất bại.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+))
+
 def send_to_make_webhook(webhook_url: str, payload: dict) -> str:
     """
     Gửi dữ liệu đến một Webhook của Make.com.
@@ -26,8 +37,7 @@ def send_to_make_webhook(webhook_url: str, payload: dict) -> str:
         str: Phản hồi từ Webhook Make.com.
     """
     try:
-        headers = {"Content-Type": "application/json"}
-        response = requests.post(webhook_url, data=json.dumps(payload), headers=headers)
+        response = _SESSION.post(webhook_url, json=payload, timeout=(3.05, 10))
         response.raise_for_status()  # Nâng lỗi cho các mã trạng thái HTTP xấu (4xx hoặc 5xx)
         return f"Dữ liệu đã được gửi thành công đến Make.com. Phản hồi: {response.text}"
     except requests.exceptions.RequestException as e:
@@ -103,6 +113,45 @@ def post_to_social_media(content: str, platform: str, image_url: str = None) ->
 # Nếu sửa đổi phạm vi, xóa tệp token.json.
 SCOPES = ["https://www.googleapis.com/auth/gmail.send"]
 
+# Credentials Gmail được dùng chung giữa các lần gửi. Service (và httplib2.Http
+# bên trong) không an toàn giữa các thread, nên mỗi thread giữ một service riêng;
+# build() chỉ chạy lại khi credentials được tải mới.
+_GMAIL_CREDS = None
+_GMAIL_LOCK = threading.Lock()
+_GMAIL_LOCAL = threading.local()
+
+def _get_gmail_service():
+    """
+    Trả về service Gmail của thread hiện tại, làm mới token khi hết hạn.
+
+    Returns:
+        Resource or None: Service Gmail, hoặc None nếu chưa được ủy quyền.
+    """
+    global _GMAIL_CREDS
+    with _GMAIL_LOCK:
+        creds = _GMAIL_CREDS
+        if creds is None and os.path.exists('token.json'):
+            creds = Credentials.from_authorized_user_file('token.json', SCOPES)
+        # Nếu không có (hoặc token hết hạn), cho phép người dùng đăng nhập
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                # Đây là phần cần sự can thiệp của người dùng để ủy quyền lần đầu
+                # Trong môi trường không có GUI, điều này sẽ phức tạp
+                # Bạn có thể cần một server OAuth để xử lý callback
+                return None
+            # Lưu token cho lần chạy tiếp theo
+            with open('token.json', 'w') as token:
+                token.write(creds.to_json())
+        _GMAIL_CREDS = creds
+
+    local = _GMAIL_LOCAL
+    if getattr(local, 'creds', None) is not creds:
+        local.service = build("gmail", "v1", credentials=creds, cache_discovery=False)
+        local.creds = creds
+    return local.service
+
 def send_gmail_message(to: str, subject: str, message_text: str) -> str:
     """
     Gửi email qua Gmail API.
@@ -124,24 +173,11 @@ def send_gmail_message(to: str, subject: str, message_text: str) -> str:
     # Trong thực tế, bạn cần một quy trình OAuth đầy đủ để lấy refresh_token và access_token
     # Dưới đây là một ví dụ đơn giản, bạn cần thay thế bằng logic xác thực thực tế của mình
     # Ví dụ: Tải token từ file token.json nếu đã ủy quyền
-    creds = None
-    if os.path.exists('token.json'):
-        creds = Credentials.from_authorized_user_file('token.json', SCOPES)
-    # Nếu không có (hoặc token hết hạn), cho phép người dùng đăng nhập
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            # Đây là phần cần sự can thiệp của người dùng để ủy quyền lần đầu
-            # Trong môi trường không có GUI, điều này sẽ phức tạp
-            # Bạn có thể cần một server OAuth để xử lý callback
-            return "Lỗi: Cần ủy quyền Gmail API. Vui lòng thiết lập token.json hoặc thực hiện quy trình OAuth."
-        # Lưu token cho lần chạy tiếp theo
-        with open('token.json', 'w') as token:
-            token.write(creds.to_json())
+    service = _get_gmail_service()
+    if service is None:
+        return "Lỗi: Cần ủy quyền Gmail API. Vui lòng thiết lập token.json hoặc thực hiện quy trình OAuth."
 
     try:
-        service = build("gmail", "v1", credentials=creds)
         message = MIMEText(message_text)
         message["to"] = to
         message["subject"] = subject
@@ -3,11 +3,13 @@ Voice API for AI Assistant
 Provides REST endpoints for voice interaction functionality
 """
 
-import os
 import io
 import logging
-import tempfile
 import base64
+import time
+import threading
+from collections import OrderedDict
+import orjson
 from typing import Dict, Any, Optional
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
@@ -16,7 +18,7 @@ from datetime import datetime
 
 # Import voice interface components
 from voice_interface import (
-    voice_manager, 
+    get_voice_manager,
     VoiceLanguage, 
     VoiceGender, 
     VoiceSettings,
@@ -34,33 +36,80 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app, origins="*")
 
+# Pre-encoded bodies for constant error responses
+_ERR_ACCESS_DENIED = orjson.dumps({'success': False, 'error': 'Access denied'})
+_ERR_SETTINGS_UPDATE_FAILED = orjson.dumps({'success': False, 'error': 'Failed to update voice settings'})
+_ERR_NO_AUDIO = orjson.dumps({'success': False, 'error': 'No audio file provided'})
+_ERR_NO_TEXT = orjson.dumps({'success': False, 'error': 'No text provided'})
+_ERR_SYNTHESIS_FAILED = orjson.dumps({'success': False, 'error': 'Speech synthesis failed'})
+_ERR_NOT_FOUND = orjson.dumps({'success': False, 'error': 'Endpoint not found'})
+_ERR_INTERNAL = orjson.dumps({'success': False, 'error': 'Internal server error'})
+
+# Allowed voice setting ranges, each with its pre-encoded 400 body
+_SETTING_RANGES = tuple(
+    (key, lo, hi, orjson.dumps({'success': False, 'error': f'{key.capitalize()} must be between {lo} and {hi}'}))
+    for key, lo, hi in (('speed', 0.5, 2.0), ('pitch', 0.5, 2.0), ('volume', 0.0, 1.0))
+)
+
+def _error_response(body: bytes, status: int):
+    """Build an error response from a pre-encoded JSON body"""
+    return app.response_class(body, status=status, mimetype='application/json')
+
 # Initialize Redis
 redis_client = redis.Redis(host='localhost', port=6379, db=7, decode_responses=True)
 
+# Byte-level client for conversation turns, which orjson parses straight from
+# bytes; turns are written to db 6 by VoiceConversationManager
+_raw_conversation_redis = redis.Redis(host='localhost', port=6379, db=6, decode_responses=False)
+
 # Initialize voice interface
 initialize_voice_interface()
 
+# Last Redis ping outcome, reused for a few seconds: [checked_at, error or None]
+_REDIS_HEALTH_TTL = 5.0
+_REDIS_HEALTH = [float('-inf'), None]
+
+def _redis_health_error(force: bool = False) -> Optional[str]:
+    """Ping Redis at most once per TTL; returns the ping error, if any"""
+    now = time.monotonic()
+    if force or now - _REDIS_HEALTH[0] >= _REDIS_HEALTH_TTL:
+        try:
+            redis_client.ping()
+            _REDIS_HEALTH[1] = None
+        except redis.RedisError as e:
+            _REDIS_HEALTH[1] = str(e)
+        _REDIS_HEALTH[0] = now
+    return _REDIS_HEALTH[1]
+
+# Encoded healthy payload, refreshed at most once per second: [built_at, body]
+_HEALTH_BODY = [float('-inf'), b'']
+
 @app.route('/api/voice/health', methods=['GET'])
 def voice_health():
-    """Health check for voice interface"""
+    """Health check for voice interface (?force=1 skips the cached Redis ping)"""
     try:
         # Test Redis connection
-        redis_client.ping()
-        
-        # Test voice components
-        voice_status = {
-            'voice_interface': True,
-            'redis_connection': True,
-            'speech_to_text': True,
-            'text_to_speech': True,
-            'supported_languages': len(VoiceLanguage),
-            'timestamp': datetime.now().isoformat()
-        }
+        error = _redis_health_error(force=request.args.get('force') == '1')
+        if error is not None:
+            logger.error(f"Voice health check failed: {error}")
+            return jsonify({
+                'status': 'unhealthy',
+                'error': error
+            }), 500
         
-        return jsonify({
-            'status': 'healthy',
-            'voice_system': voice_status
-        }), 200
+        now = time.monotonic()
+        if now - _HEALTH_BODY[0] >= 1.0:
+            _HEALTH_BODY[1] = orjson.dumps({
+                'status': 'healthy',
+                'voice_system': {
+                    'redis_connection': True,
+                    'supported_languages': len(VoiceLanguage),
+                    'timestamp': datetime.now()
+                }
+            })
+            _HEALTH_BODY[0] = now
+        
+        return app.response_class(_HEALTH_BODY[1], mimetype='application/json'), 200
         
     except Exception as e:
         logger.error(f"Voice health check failed: {str(e)}")
@@ -72,27 +121,8 @@ def voice_health():
 @app.route('/api/voice/languages', methods=['GET'])
 def get_supported_languages():
     """Get list of supported voice languages"""
-    try:
-        languages = []
-        for lang in VoiceLanguage:
-            languages.append({
-                'code': lang.value,
-                'name': lang.name,
-                'display_name': _get_language_display_name(lang.value)
-            })
-        
-        return jsonify({
-            'success': True,
-            'languages': languages,
-            'total': len(languages)
-        }), 200
-        
-    except Exception as e:
-        logger.error(f"Error getting supported languages: {str(e)}")
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    # The language list is fixed, so the body is encoded once at import
+    return app.response_class(_LANGUAGES_JSON, mimetype='application/json'), 200
 
 @app.route('/api/voice/settings/<user_id>', methods=['GET'])
 @require_auth
@@ -101,22 +131,13 @@ def get_voice_settings(user_id: str):
     try:
         # Check if user can access these settings
         if not _can_access_user_data(request.user_id, user_id):
-            return jsonify({
-                'success': False,
-                'error': 'Access denied'
-            }), 403
+            return _error_response(_ERR_ACCESS_DENIED, 403)
         
-        settings = voice_manager._get_user_voice_settings(user_id)
+        settings = get_voice_manager()._get_user_voice_settings(user_id)
         
         return jsonify({
             'success': True,
-            'settings': {
-                'language': settings.language.value,
-                'gender': settings.gender.value,
-                'speed': settings.speed,
-                'pitch': settings.pitch,
-                'volume': settings.volume
-            }
+            'settings': settings.to_dict()
         }), 200
         
     except Exception as e:
@@ -133,10 +154,7 @@ def set_voice_settings(user_id: str):
     try:
         # Check if user can modify these settings
         if not _can_access_user_data(request.user_id, user_id):
-            return jsonify({
-                'success': False,
-                'error': 'Access denied'
-            }), 403
+            return _error_response(_ERR_ACCESS_DENIED, 403)
         
         data = request.get_json()
         
@@ -150,26 +168,12 @@ def set_voice_settings(user_id: str):
         }
         
         # Validate ranges
-        if not (0.5 <= settings_data['speed'] <= 2.0):
-            return jsonify({
-                'success': False,
-                'error': 'Speed must be between 0.5 and 2.0'
-            }), 400
-        
-        if not (0.5 <= settings_data['pitch'] <= 2.0):
-            return jsonify({
-                'success': False,
-                'error': 'Pitch must be between 0.5 and 2.0'
-            }), 400
-        
-        if not (0.0 <= settings_data['volume'] <= 1.0):
-            return jsonify({
-                'success': False,
-                'error': 'Volume must be between 0.0 and 1.0'
-            }), 400
+        for key, lo, hi, error_body in _SETTING_RANGES:
+            if not (lo <= settings_data[key] <= hi):
+                return _error_response(error_body, 400)
         
         # Set settings
-        success = voice_manager.set_user_voice_settings(user_id, settings_data)
+        success = get_voice_manager().set_user_voice_settings(user_id, settings_data)
         
         if success:
             return jsonify({
@@ -177,10 +181,7 @@ def set_voice_settings(user_id: str):
                 'message': 'Voice settings updated successfully'
             }), 200
         else:
-            return jsonify({
-                'success': False,
-                'error': 'Failed to update voice settings'
-            }), 500
+            return _error_response(_ERR_SETTINGS_UPDATE_FAILED, 500)
             
     except Exception as e:
         logger.error(f"Error setting voice settings: {str(e)}")
@@ -198,7 +199,7 @@ def start_voice_conversation():
         user_id = request.user_id
         language = data.get('language', 'en-US')
         
-        result = voice_manager.start_voice_conversation(user_id, language)
+        result = get_voice_manager().start_voice_conversation(user_id, language)
         
         if result['success']:
             return jsonify(result), 200
@@ -221,10 +222,7 @@ def process_voice_input():
         
         # Check if audio file is provided
         if 'audio' not in request.files:
-            return jsonify({
-                'success': False,
-                'error': 'No audio file provided'
-            }), 400
+            return _error_response(_ERR_NO_AUDIO, 400)
         
         audio_file = request.files['audio']
         
@@ -232,7 +230,7 @@ def process_voice_input():
         audio_data = audio_file.read()
         
         # Process voice input
-        result = voice_manager.process_voice_input(user_id, audio_data)
+        result = get_voice_manager().process_voice_input(user_id, audio_data)
         
         return jsonify(result), 200 if result['success'] else 500
         
@@ -250,7 +248,7 @@ def end_voice_conversation():
     try:
         user_id = request.user_id
         
-        result = voice_manager.end_voice_conversation(user_id)
+        result = get_voice_manager().end_voice_conversation(user_id)
         
         return jsonify(result), 200 if result['success'] else 500
         
@@ -268,32 +266,21 @@ def transcribe_audio():
     try:
         # Check if audio file is provided
         if 'audio' not in request.files:
-            return jsonify({
-                'success': False,
-                'error': 'No audio file provided'
-            }), 400
+            return _error_response(_ERR_NO_AUDIO, 400)
         
         audio_file = request.files['audio']
         language = request.form.get('language', 'en-US')
         
-        # Save audio to temporary file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-            audio_file.save(temp_file.name)
-            temp_file_path = temp_file.name
+        # Werkzeug already buffers the upload (in memory when small, spooled
+        # to disk when large), so transcribe straight from its stream
+        success, text = get_voice_manager().stt_engine.transcribe_audio_stream(audio_file.stream, language)
         
-        try:
-            # Transcribe audio
-            success, text = voice_manager.stt_engine.transcribe_audio_file(temp_file_path, language)
-            
-            return jsonify({
-                'success': success,
-                'text': text if success else None,
-                'error': text if not success else None,
-                'language': language
-            }), 200 if success else 400
-            
-        finally:
-            os.unlink(temp_file_path)
+        return jsonify({
+            'success': success,
+            'text': text if success else None,
+            'error': text if not success else None,
+            'language': language
+        }), 200 if success else 400
             
     except Exception as e:
         logger.error(f"Error transcribing audio: {str(e)}")
@@ -312,32 +299,28 @@ def synthesize_speech():
         user_id = request.user_id
         
         if not text:
-            return jsonify({
-                'success': False,
-                'error': 'No text provided'
-            }), 400
+            return _error_response(_ERR_NO_TEXT, 400)
         
         # Get user voice settings
-        settings = voice_manager._get_user_voice_settings(user_id)
+        settings = get_voice_manager()._get_user_voice_settings(user_id)
         
         # Synthesize speech
-        success, audio_data = voice_manager.tts_engine.synthesize_speech_stream(text, settings)
+        success, audio_data = get_voice_manager().tts_engine.synthesize_speech_stream(text, settings)
         
         if success:
-            # Return audio as base64
-            audio_b64 = base64.b64encode(audio_data).decode()
+            # Clients that accept WAV get the raw bytes, without base64's 33% overhead
+            if _wants_wav():
+                return send_file(io.BytesIO(audio_data), mimetype='audio/wav', download_name='tts.wav')
             
-            return jsonify({
+            # Return audio as base64
+            return app.response_class(orjson.dumps({
                 'success': True,
-                'audio_data': audio_b64,
+                'audio_data': base64.b64encode(audio_data).decode('ascii'),
                 'format': 'wav',
                 'text': text
-            }), 200
+            }), mimetype='application/json'), 200
         else:
-            return jsonify({
-                'success': False,
-                'error': 'Speech synthesis failed'
-            }), 500
+            return _error_response(_ERR_SYNTHESIS_FAILED, 500)
             
     except Exception as e:
         logger.error(f"Error synthesizing speech: {str(e)}")
@@ -353,28 +336,23 @@ def get_conversation_history(user_id: str):
     try:
         # Check if user can access this data
         if not _can_access_user_data(request.user_id, user_id):
-            return jsonify({
-                'success': False,
-                'error': 'Access denied'
-            }), 403
+            return _error_response(_ERR_ACCESS_DENIED, 403)
         
         # Get conversation history from Redis
-        history_data = redis_client.lrange(f"voice_conversation:{user_id}", 0, 49)  # Last 50 turns
+        history_data = _raw_conversation_redis.lrange(f"voice_conversation:{user_id}", 0, 49)  # Last 50 turns
         
         history = []
         for item in history_data:
             try:
-                import json
-                turn_data = json.loads(item)
-                history.append(turn_data)
-            except:
+                history.append(orjson.loads(item))
+            except orjson.JSONDecodeError:
                 continue
         
-        return jsonify({
+        return app.response_class(orjson.dumps({
             'success': True,
             'history': history,
             'total_turns': len(history)
-        }), 200
+        }), mimetype='application/json'), 200
         
     except Exception as e:
         logger.error(f"Error getting conversation history: {str(e)}")
@@ -393,15 +371,16 @@ def test_voice_system():
         user_id = request.user_id
         
         # Get user settings
-        settings = voice_manager._get_user_voice_settings(user_id)
+        settings = get_voice_manager()._get_user_voice_settings(user_id)
         
         # Test TTS
-        tts_success, audio_data = voice_manager.tts_engine.synthesize_speech_stream(test_text, settings)
+        tts_success, audio_data = get_voice_manager().tts_engine.synthesize_speech_stream(test_text, settings)
         
         if tts_success:
-            audio_b64 = base64.b64encode(audio_data).decode()
+            if _wants_wav():
+                return send_file(io.BytesIO(audio_data), mimetype='audio/wav', download_name='test.wav')
             
-            return jsonify({
+            return app.response_class(orjson.dumps({
                 'success': True,
                 'test_results': {
                     'text_to_speech': True,
@@ -409,9 +388,9 @@ def test_voice_system():
                     'audio_size': len(audio_data),
                     'settings_applied': True
                 },
-                'audio_data': audio_b64,
+                'audio_data': base64.b64encode(audio_data).decode('ascii'),
                 'test_text': test_text
-            }), 200
+            }), mimetype='application/json'), 200
         else:
             return jsonify({
                 'success': False,
@@ -428,25 +407,68 @@ def test_voice_system():
             'error': str(e)
         }), 500
 
+def _wants_wav() -> bool:
+    """Whether the client asked for raw WAV audio instead of base64 JSON"""
+    return 'audio/wav' in request.headers.get('Accept', '')
+
+_LANGUAGE_NAMES = {
+    'en-US': 'English (US)',
+    'vi-VN': 'Tiếng Việt',
+    'zh-CN': '中文 (简体)',
+    'ja-JP': '日本語',
+    'ko-KR': '한국어',
+    'es-ES': 'Español',
+    'fr-FR': 'Français',
+    'de-DE': 'Deutsch',
+    'it-IT': 'Italiano',
+    'pt-PT': 'Português',
+    'ru-RU': 'Русский',
+    'ar-SA': 'العربية',
+    'hi-IN': 'हिन्दी',
+    'th-TH': 'ไทย'
+}
+
 def _get_language_display_name(language_code: str) -> str:
     """Get display name for language code"""
-    language_names = {
-        'en-US': 'English (US)',
-        'vi-VN': 'Tiếng Việt',
-        'zh-CN': '中文 (简体)',
-        'ja-JP': '日本語',
-        'ko-KR': '한국어',
-        'es-ES': 'Español',
-        'fr-FR': 'Français',
-        'de-DE': 'Deutsch',
-        'it-IT': 'Italiano',
-        'pt-PT': 'Português',
-        'ru-RU': 'Русский',
-        'ar-SA': 'العربية',
-        'hi-IN': 'हिन्दी',
-        'th-TH': 'ไทย'
-    }
-    return language_names.get(language_code, language_code)
+    return _LANGUAGE_NAMES.get(language_code, language_code)
+
+_LANGUAGES_JSON = orjson.dumps({
+    'success': True,
+    'languages': [
+        {
+            'code': lang.value,
+            'name': lang.name,
+            'display_name': _get_language_display_name(lang.value)
+        }
+        for lang in VoiceLanguage
+    ],
+    'total': len(VoiceLanguage)
+})
+
+# Requester roles for cross-user checks, LRU: user_id -> (expires_at, role).
+# Only the role is cached; what a role may do is checked live against the
+# authorization manager, which already tracks permission changes
+_ROLE_CACHE_SIZE = 10000
+_ROLE_CACHE_TTL = 60.0
+_ROLE_CACHE: OrderedDict = OrderedDict()
+_ROLE_CACHE_LOCK = threading.Lock()
+
+def _get_requester_role(user_id: str):
+    """A user's role, cached for _ROLE_CACHE_TTL seconds"""
+    now = time.monotonic()
+    with _ROLE_CACHE_LOCK:
+        entry = _ROLE_CACHE.get(user_id)
+        if entry is not None and entry[0] > now:
+            _ROLE_CACHE.move_to_end(user_id)
+            return entry[1]
+    
+    role = security_manager.get_user_role(user_id)
+    with _ROLE_CACHE_LOCK:
+        _ROLE_CACHE[user_id] = (now + _ROLE_CACHE_TTL, role)
+        _ROLE_CACHE.move_to_end(user_id)
+        if len(_ROLE_CACHE) > _ROLE_CACHE_SIZE:
+            _ROLE_CACHE.popitem(last=False)
+    return role
 
 def _can_access_user_data(requester_id: str, target_user_id: str) -> bool:
     """Check if requester can access target user's data"""
@@ -454,28 +476,26 @@ def _can_access_user_data(requester_id: str, target_user_id: str) -> bool:
     if requester_id == target_user_id:
         return True
     
-    # Check if requester has admin permissions
+    # Otherwise the requester needs to be allowed to read other users
     try:
-        user_permissions = security_manager.get_user_permissions(requester_id)
-        return 'admin' in user_permissions or 'manage_users' in user_permissions
-    except:
+        role = _get_requester_role(requester_id)
+    except Exception as e:
+        logger.error(f"Error checking permissions for {requester_id}: {str(e)}")
         return False
+    return role is not None and security_manager.authz.check_permission(role, 'user:read')
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
-        'success': False,
-        'error': 'Endpoint not found'
-    }), 404
+    return _error_response(_ERR_NOT_FOUND, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
-        'success': False,
-        'error': 'Internal server error'
-    }), 500
+    return _error_response(_ERR_INTERNAL, 500)
 
 if __name__ == '__main__':
     logger.info("Starting Voice API server")
-    app.run(host='0.0.0.0', port=5001, debug=False)
+    
+    # Development server only; in production run:
+    #   GUNICORN_BIND=0.0.0.0:5001 gunicorn -c gunicorn_conf.py voice_api:app
+    app.run(host='0.0.0.0', port=5001, debug=False, threaded=True)
 
@@ -7,11 +7,17 @@ import os
 import io
 import logging
 import tempfile
-import base64
-from typing import Dict, Any, Optional, Tuple, List
-from dataclasses import dataclass
+import hashlib
+import struct
+import string
+import wave
+from typing import Dict, Any, BinaryIO, Optional, Tuple, List, Union
+from dataclasses import dataclass, field
 from enum import Enum
-import json
+from collections import OrderedDict, deque
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+import orjson
 import redis
 import speech_recognition as sr
 from pydub import AudioSegment
@@ -23,6 +29,62 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Shared Redis connection pools for db 6: text replies and raw audio bytes
+_REDIS_POOL = redis.ConnectionPool(host='localhost', port=6379, db=6,
+                                   decode_responses=True, max_connections=32)
+_REDIS_POOL_BIN = redis.ConnectionPool(host='localhost', port=6379, db=6,
+                                       decode_responses=False, max_connections=32)
+
+# Voice sessions expire a day after their last write; settings 30 days after last use
+SESSION_TTL = 86400
+SETTINGS_TTL = 30 * 86400
+
+# Runs Redis persistence of a voice turn while its reply is being synthesized
+_PERSIST_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='voice-persist')
+
+# The TTS tool only writes to a path; keep its scratch files on tmpfs when available
+_TTS_SCRATCH_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Audio files handed back to callers live on disk and are swept once stale
+_TTS_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), 'voice_tts')
+_TTS_OUTPUT_TTL = 3600
+_TTS_SWEEP_INTERVAL = 60
+_tts_last_sweep = 0.0
+_tts_sweep_lock = threading.Lock()
+
+def _new_tts_output_file() -> Tuple[int, str]:
+    """Open a fresh output file, first deleting ones older than _TTS_OUTPUT_TTL"""
+    global _tts_last_sweep
+    os.makedirs(_TTS_OUTPUT_DIR, exist_ok=True)
+    now = time.time()
+    if now - _tts_last_sweep > _TTS_SWEEP_INTERVAL and _tts_sweep_lock.acquire(blocking=False):
+        try:
+            _tts_last_sweep = now
+            with os.scandir(_TTS_OUTPUT_DIR) as entries:
+                for entry in entries:
+                    try:
+                        if entry.stat().st_mtime < now - _TTS_OUTPUT_TTL:
+                            os.unlink(entry.path)
+                    except OSError:
+                        pass
+        finally:
+            _tts_sweep_lock.release()
+    return tempfile.mkstemp(suffix=".wav", dir=_TTS_OUTPUT_DIR)
+
+def _silence_wav(duration: float = 0.1, sample_rate: int = 16000) -> bytes:
+    """Mono 16-bit WAV of silence"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(2 * int(sample_rate * duration)))
+    return buffer.getvalue()
+
+# Text made only of these has nothing to say; it gets a short silence instead of a synthesis
+_SILENT_CHARS = string.whitespace + string.punctuation + '…。、！？'
+_SILENCE_WAV = _silence_wav()
+
 class VoiceLanguage(Enum):
     ENGLISH = "en-US"
     VIETNAMESE = "vi-VN"
@@ -44,13 +106,41 @@ class VoiceGender(Enum):
     FEMALE = "female"
     NEUTRAL = "neutral"
 
-@dataclass
+# Stable small-integer ids for packing settings into cache keys
+_LANGUAGE_INDEX = {lang: i for i, lang in enumerate(VoiceLanguage)}
+_GENDER_INDEX = {gender: i for i, gender in enumerate(VoiceGender)}
+
+# Stored value -> enum member, for rebuilding settings from requests and Redis
+_LANG_ENUM = {lang.value: lang for lang in VoiceLanguage}
+_GENDER_ENUM = {gender.value: gender for gender in VoiceGender}
+
+@dataclass(frozen=True, slots=True)
 class VoiceSettings:
     language: VoiceLanguage
     gender: VoiceGender
     speed: float = 1.0  # 0.5 to 2.0
     pitch: float = 1.0  # 0.5 to 2.0
     volume: float = 1.0  # 0.0 to 1.0
+    # Derived once per instance for the TTS path
+    voice_type: str = field(init=False, repr=False, compare=False)
+    cache_key_prefix: bytes = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'voice_type',
+                           "female_voice" if self.gender == VoiceGender.FEMALE else "male_voice")
+        object.__setattr__(self, 'cache_key_prefix', struct.pack(
+            '<BBdd', _LANGUAGE_INDEX[self.language], _GENDER_INDEX[self.gender], self.speed, self.pitch
+        ))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready view of the user-facing settings"""
+        return {
+            'language': self.language.value,
+            'gender': self.gender.value,
+            'speed': self.speed,
+            'pitch': self.pitch,
+            'volume': self.volume
+        }
 
 @dataclass
 class AudioData:
@@ -65,8 +155,10 @@ class SpeechToTextEngine:
     
     def __init__(self):
         self.recognizer = sr.Recognizer()
-        self.microphone = None
-        self.redis_client = redis.Redis(host='localhost', port=6379, db=6, decode_responses=True)
+        self._microphone = None
+        self._microphone_probed = False
+        self._microphone_lock = threading.Lock()
+        self.redis_client = redis.Redis(connection_pool=_REDIS_POOL)
         
         # Configure recognizer settings
         self.recognizer.energy_threshold = 300
@@ -75,20 +167,46 @@ class SpeechToTextEngine:
         self.recognizer.operation_timeout = None
         self.recognizer.phrase_threshold = 0.3
         self.recognizer.non_speaking_duration = 0.8
-        
-        # Initialize microphone if available
-        try:
-            self.microphone = sr.Microphone()
-            with self.microphone as source:
+    
+    @property
+    def microphone(self) -> Optional[sr.Microphone]:
+        """Microphone, probed and calibrated on first use; None if unavailable"""
+        if not self._microphone_probed:
+            with self._microphone_lock:
+                if not self._microphone_probed:
+                    try:
+                        microphone = sr.Microphone()
+                        with microphone as source:
+                            self.recognizer.adjust_for_ambient_noise(source)
+                        self._microphone = microphone
+                        logger.info("Microphone initialized successfully")
+                    except Exception as e:
+                        logger.warning(f"Microphone not available: {str(e)}")
+                    self._microphone_probed = True
+        return self._microphone
+    
+    def recalibrate(self) -> bool:
+        """Re-measure ambient noise, e.g. after the environment changes"""
+        microphone = self.microphone
+        if not microphone:
+            return False
+        with self._microphone_lock:
+            with microphone as source:
                 self.recognizer.adjust_for_ambient_noise(source)
-            logger.info("Microphone initialized successfully")
-        except Exception as e:
-            logger.warning(f"Microphone not available: {str(e)}")
+        return True
     
     def transcribe_audio_file(self, audio_file_path: str, language: str = "en-US") -> Tuple[bool, str]:
         """Transcribe audio file to text"""
+        return self._transcribe(audio_file_path, language)
+    
+    def transcribe_audio_stream(self, audio_stream: BinaryIO, language: str = "en-US") -> Tuple[bool, str]:
+        """Transcribe audio from a seekable file-like object, without writing it to disk"""
+        return self._transcribe(audio_stream, language)
+    
+    def _transcribe(self, audio_source: Union[str, BinaryIO], language: str) -> Tuple[bool, str]:
+        """Transcribe a WAV/AIFF/FLAC path or file object to text"""
         try:
-            with sr.AudioFile(audio_file_path) as source:
+            with sr.AudioFile(audio_source) as source:
                 audio = self.recognizer.record(source)
             
             # Try Google Speech Recognition first
@@ -114,17 +232,8 @@ class SpeechToTextEngine:
     def transcribe_audio_data(self, audio_data: bytes, language: str = "en-US") -> Tuple[bool, str]:
         """Transcribe audio data to text"""
         try:
-            # Save audio data to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
-            
-            try:
-                result = self.transcribe_audio_file(temp_file_path, language)
-                return result
-            finally:
-                os.unlink(temp_file_path)
-                
+            # AudioFile sniffs WAV/AIFF/FLAC from the content, so no temp file is needed
+            return self._transcribe(io.BytesIO(audio_data), language)
         except Exception as e:
             logger.error(f"Error transcribing audio data: {str(e)}")
             return False, f"Error: {str(e)}"
@@ -136,9 +245,7 @@ class SpeechToTextEngine:
             return
         
         def listen_worker():
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source)
-            
+            # The microphone was calibrated when first opened; see recalibrate()
             stop_listening = self.recognizer.listen_in_background(
                 self.microphone, 
                 lambda recognizer, audio: self._process_audio_background(recognizer, audio, callback, language),
@@ -167,9 +274,20 @@ class TextToSpeechEngine:
     """Handles text-to-speech conversion"""
     
     def __init__(self):
-        self.redis_client = redis.Redis(host='localhost', port=6379, db=6, decode_responses=True)
+        # Audio is cached as raw bytes, so the client must not decode replies
+        self.redis_bin = redis.Redis(connection_pool=_REDIS_POOL_BIN)
         self.cache_enabled = True
         
+        # Process-local LRU of hot phrases in front of Redis: cache_key -> audio bytes
+        self.memory_cache_bytes = 32 * 1024 * 1024
+        self._memory_cache: OrderedDict = OrderedDict()
+        self._memory_cache_size = 0
+        self._memory_cache_lock = threading.Lock()
+        
+        # Syntheses in progress: cache_key -> Future, so concurrent identical requests share one
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
         # Default voice settings
         self.default_settings = VoiceSettings(
             language=VoiceLanguage.ENGLISH,
@@ -185,42 +303,19 @@ class TextToSpeechEngine:
             settings = self.default_settings
         
         try:
-            # Check cache first
-            if self.cache_enabled:
-                cached_audio = self._get_cached_audio(text, settings)
-                if cached_audio and output_file:
-                    with open(output_file, 'wb') as f:
-                        f.write(base64.b64decode(cached_audio))
-                    return True, output_file
-            
-            # Use the media_generate_speech tool for actual TTS
-            if not output_file:
-                output_file = tempfile.mktemp(suffix=".wav")
-            
-            # Import the media generation function
-            from media_generate_speech import media_generate_speech
-            
-            # Determine voice type based on gender
-            voice_type = "female_voice" if settings.gender == VoiceGender.FEMALE else "male_voice"
-            
-            # Generate speech
-            result = media_generate_speech(
-                brief="Generate speech for voice interface",
-                path=output_file,
-                text=text,
-                voice=voice_type
-            )
+            audio_data = self._synthesize_to_bytes(text, settings)
+            if audio_data is None:
+                return False, "Speech synthesis failed"
             
-            if result and os.path.exists(output_file):
-                # Cache the result
-                if self.cache_enabled:
-                    with open(output_file, 'rb') as f:
-                        audio_data = f.read()
-                    self._cache_audio(text, settings, audio_data)
-                
-                return True, output_file
+            if output_file:
+                with open(output_file, 'wb') as f:
+                    f.write(audio_data)
             else:
-                return False, "Speech synthesis failed"
+                fd, output_file = _new_tts_output_file()
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(audio_data)
+            
+            return True, output_file
                 
         except Exception as e:
             logger.error(f"Error synthesizing speech: {str(e)}")
@@ -228,39 +323,146 @@ class TextToSpeechEngine:
     
     def synthesize_speech_stream(self, text: str, settings: VoiceSettings = None) -> Tuple[bool, bytes]:
         """Convert text to speech and return audio data"""
-        success, output_file = self.synthesize_speech(text, settings)
+        if not settings:
+            settings = self.default_settings
         
-        if success:
+        try:
+            audio_data = self._synthesize_to_bytes(text, settings)
+            if audio_data is None:
+                return False, b""
+            return True, audio_data
+        except Exception as e:
+            logger.error(f"Error synthesizing speech: {str(e)}")
+            return False, b""
+    
+    def _synthesize_to_bytes(self, text: str, settings: VoiceSettings) -> Optional[bytes]:
+        """Synthesize speech into memory, serving and filling the cache"""
+        if not text or not text.strip(_SILENT_CHARS):
+            return _SILENCE_WAV
+        
+        cache_key = self._generate_cache_key(text, settings)
+        if self.cache_enabled:
+            cached_audio = self._get_cached_audio(cache_key)
+            if cached_audio:
+                return cached_audio
+        
+        # Join an identical synthesis already running instead of starting another
+        with self._inflight_lock:
+            pending = self._inflight.get(cache_key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[cache_key] = Future()
+        if not leader:
+            return pending.result()
+        
+        try:
             try:
-                with open(output_file, 'rb') as f:
-                    audio_data = f.read()
-                os.unlink(output_file)
-                return True, audio_data
+                audio_data = self._run_synthesis(text, settings)
             except Exception as e:
-                logger.error(f"Error reading audio file: {str(e)}")
-                return False, b""
+                pending.set_exception(e)
+                raise
+            pending.set_result(audio_data)
+            
+            # Cache before leaving the in-flight table, so a request arriving now
+            # finds either the leader or the cached audio
+            if audio_data and self.cache_enabled:
+                self._cache_audio(cache_key, audio_data)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
         
-        return False, b""
+        return audio_data
     
-    def _get_cached_audio(self, text: str, settings: VoiceSettings) -> Optional[str]:
+    def _run_synthesis(self, text: str, settings: VoiceSettings) -> Optional[bytes]:
+        """Run the TTS tool once and return the audio it produced"""
+        # Import the media generation function
+        from media_generate_speech import media_generate_speech
+        
+        fd, scratch_file = tempfile.mkstemp(suffix=".wav", dir=_TTS_SCRATCH_DIR)
+        os.close(fd)
+        try:
+            result = media_generate_speech(
+                brief="Generate speech for voice interface",
+                path=scratch_file,
+                text=text,
+                voice=settings.voice_type
+            )
+            if not result:
+                return None
+            # Unbuffered readall sizes one allocation from fstat, with no intermediate copy
+            with open(scratch_file, 'rb', buffering=0) as f:
+                audio_data = f.read()
+        finally:
+            try:
+                os.unlink(scratch_file)
+            except OSError:
+                pass
+        
+        return audio_data or None
+    
+    def _get_cached_audio(self, cache_key: str) -> Optional[bytes]:
         """Get cached audio data"""
-        cache_key = self._generate_cache_key(text, settings)
-        return self.redis_client.get(cache_key)
+        with self._memory_cache_lock:
+            audio_data = self._memory_cache.get(cache_key)
+            if audio_data is not None:
+                self._memory_cache.move_to_end(cache_key)
+                return audio_data
+        
+        audio_data = self.redis_bin.get(cache_key)
+        if audio_data:
+            self._remember_audio(cache_key, audio_data)
+        return audio_data
     
-    def _cache_audio(self, text: str, settings: VoiceSettings, audio_data: bytes):
+    def _cache_audio(self, cache_key: str, audio_data: bytes):
         """Cache audio data"""
-        cache_key = self._generate_cache_key(text, settings)
-        audio_b64 = base64.b64encode(audio_data).decode()
+        self._remember_audio(cache_key, audio_data)
         # Cache for 24 hours
-        self.redis_client.setex(cache_key, 86400, audio_b64)
+        self.redis_bin.setex(cache_key, 86400, audio_data)
+    
+    def _remember_audio(self, cache_key: str, audio_data: bytes):
+        """Put audio in the in-process LRU, evicting until it fits the byte budget"""
+        size = len(audio_data)
+        if size > self.memory_cache_bytes:
+            return
+        with self._memory_cache_lock:
+            previous = self._memory_cache.pop(cache_key, None)
+            if previous is not None:
+                self._memory_cache_size -= len(previous)
+            self._memory_cache[cache_key] = audio_data
+            self._memory_cache_size += size
+            while self._memory_cache_size > self.memory_cache_bytes:
+                _, evicted = self._memory_cache.popitem(last=False)
+                self._memory_cache_size -= len(evicted)
     
     def _generate_cache_key(self, text: str, settings: VoiceSettings) -> str:
         """Generate cache key for audio"""
-        import hashlib
-        
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        settings_str = f"{settings.language.value}_{settings.gender.value}_{settings.speed}_{settings.pitch}"
-        return f"tts:{text_hash}_{settings_str}"
+        # One BLAKE2b pass over the packed settings followed by the text
+        digest = hashlib.blake2b(settings.cache_key_prefix, digest_size=16)
+        digest.update(text.encode())
+        return f"tts:{digest.hexdigest()}"
+
+# Session greetings by language; en-US is the fallback
+_WELCOME_MESSAGES = {
+    'en-US': "Hello! I'm your AI assistant. How can I help you today?",
+    'vi-VN': "Xin chào! Tôi là trợ lý AI của bạn. Tôi có thể giúp gì cho bạn hôm nay?",
+    'zh-CN': "您好！我是您的AI助手。今天我能为您做些什么？",
+    'ja-JP': "こんにちは！私はあなたのAIアシスタントです。今日はどのようにお手伝いできますか？",
+    'ko-KR': "안녕하세요! 저는 당신의 AI 어시스턴트입니다. 오늘 어떻게 도와드릴까요?",
+    'es-ES': "¡Hola! Soy tu asistente de IA. ¿Cómo puedo ayudarte hoy?",
+    'fr-FR': "Bonjour! Je suis votre assistant IA. Comment puis-je vous aider aujourd'hui?",
+    'de-DE': "Hallo! Ich bin Ihr KI-Assistent. Wie kann ich Ihnen heute helfen?",
+}
+
+_GOODBYE_MESSAGES = {
+    'en-US': "Thank you for using the voice assistant. Have a great day!",
+    'vi-VN': "Cảm ơn bạn đã sử dụng trợ lý giọng nói. Chúc bạn một ngày tốt lành!",
+    'zh-CN': "感谢您使用语音助手。祝您有美好的一天！",
+    'ja-JP': "音声アシスタントをご利用いただき、ありがとうございました。良い一日をお過ごしください！",
+    'ko-KR': "음성 어시스턴트를 사용해 주셔서 감사합니다. 좋은 하루 되세요!",
+    'es-ES': "Gracias por usar el asistente de voz. ¡Que tengas un gran día!",
+    'fr-FR': "Merci d'avoir utilisé l'assistant vocal. Passez une excellente journée!",
+    'de-DE': "Vielen Dank für die Nutzung des Sprachassistenten. Haben Sie einen schönen Tag!",
+}
 
 class VoiceConversationManager:
     """Manages voice conversations with the AI assistant"""
@@ -268,11 +470,14 @@ class VoiceConversationManager:
     def __init__(self):
         self.stt_engine = SpeechToTextEngine()
         self.tts_engine = TextToSpeechEngine()
-        self.redis_client = redis.Redis(host='localhost', port=6379, db=6, decode_responses=True)
+        self.redis_client = redis.Redis(connection_pool=_REDIS_POOL)
         
         self.conversation_active = False
         self.user_settings = {}
-        self.conversation_history = []
+        # Matches the 100 turns kept in Redis; turn_count keeps counting past it
+        self.conversation_history = deque(maxlen=100)
+        self.turn_count = 0
+        self._ai_assistant = None
     
     def start_voice_conversation(self, user_id: str, language: str = "en-US") -> Dict[str, Any]:
         """Start a voice conversation session"""
@@ -282,7 +487,8 @@ class VoiceConversationManager:
             
             # Initialize conversation
             self.conversation_active = True
-            self.conversation_history = []
+            self.conversation_history.clear()
+            self.turn_count = 0
             
             # Store session info
             session_data = {
@@ -292,7 +498,7 @@ class VoiceConversationManager:
                 'status': 'active'
             }
             
-            self.redis_client.hset(f"voice_session:{user_id}", mapping=session_data)
+            self._hset_with_ttl(f"voice_session:{user_id}", session_data, SESSION_TTL)
             
             # Generate welcome message
             welcome_text = self._get_welcome_message(language)
@@ -304,7 +510,7 @@ class VoiceConversationManager:
                 'welcome_audio': audio_file if success else None,
                 'welcome_text': welcome_text,
                 'language': language,
-                'settings': settings.__dict__
+                'settings': settings.to_dict()
             }
             
         except Exception as e:
@@ -317,13 +523,22 @@ class VoiceConversationManager:
     def process_voice_input(self, user_id: str, audio_data: bytes) -> Dict[str, Any]:
         """Process voice input and return AI response"""
         try:
-            # Get session info
-            session_data = self.redis_client.hgetall(f"voice_session:{user_id}")
+            # Get session info, fetching stored settings in the same round-trip if not cached
+            settings = self.user_settings.get(user_id)
+            if settings is None:
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.hgetall(f"voice_session:{user_id}")
+                pipe.hgetall(f"voice_settings:{user_id}")
+                pipe.expire(f"voice_settings:{user_id}", SETTINGS_TTL)
+                session_data, settings_data, _ = pipe.execute()
+            else:
+                session_data = self.redis_client.hgetall(f"voice_session:{user_id}")
             if not session_data:
                 return {'success': False, 'error': 'No active voice session'}
             
             language = session_data.get('language', 'en-US')
-            settings = self._get_user_voice_settings(user_id)
+            if settings is None:
+                settings = self._load_user_voice_settings(user_id, settings_data)
             
             # Transcribe speech to text
             success, transcribed_text = self.stt_engine.transcribe_audio_data(audio_data, language)
@@ -336,37 +551,43 @@ class VoiceConversationManager:
                 }
             
             # Process with AI assistant
-            from core_agent import PersonalAIAssistant
-            ai_assistant = PersonalAIAssistant()
+            ai_assistant = self._get_assistant()
             
             context = {
                 'user_id': user_id,
                 'voice_mode': True,
                 'language': language,
-                'conversation_history': self.conversation_history[-5:]  # Last 5 exchanges
+                'conversation_history': list(self.conversation_history)[-5:]  # Last 5 exchanges
             }
             
             ai_response = ai_assistant.process_request(user_id, transcribed_text, context)
             
+            # One timestamp for the turn, shared by Redis and the in-memory history
+            timestamp = datetime.now().isoformat()
+            
+            # Store conversation in Redis while the response is synthesized
+            stored = _PERSIST_EXECUTOR.submit(self._store_conversation_turn, user_id, transcribed_text,
+                                              ai_response, timestamp)
+            
             # Convert AI response to speech
             tts_success, response_audio = self.tts_engine.synthesize_speech(ai_response, settings)
             
             # Update conversation history
             self.conversation_history.append({
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp,
                 'user_input': transcribed_text,
                 'ai_response': ai_response
             })
+            self.turn_count += 1
             
-            # Store conversation in Redis
-            self._store_conversation_turn(user_id, transcribed_text, ai_response)
+            stored.result()
             
             return {
                 'success': True,
                 'transcribed_text': transcribed_text,
                 'ai_response': ai_response,
                 'response_audio': response_audio if tts_success else None,
-                'conversation_id': len(self.conversation_history)
+                'conversation_id': self.turn_count
             }
             
         except Exception as e:
@@ -376,6 +597,14 @@ class VoiceConversationManager:
                 'error': str(e)
             }
     
+    def _get_assistant(self):
+        """AI assistant shared by all voice turns, built on first use"""
+        if self._ai_assistant is None:
+            # Imported here: core_agent sets up its agents at import time
+            from core_agent import PersonalAIAssistant
+            self._ai_assistant = PersonalAIAssistant()
+        return self._ai_assistant
+    
     def end_voice_conversation(self, user_id: str) -> Dict[str, Any]:
         """End voice conversation session"""
         try:
@@ -384,9 +613,10 @@ class VoiceConversationManager:
             
             if session_data:
                 # Update session status
-                session_data['status'] = 'ended'
-                session_data['ended_at'] = datetime.now().isoformat()
-                self.redis_client.hset(f"voice_session:{user_id}", mapping=session_data)
+                ended_at = datetime.now()
+                ended = {'status': 'ended', 'ended_at': ended_at.isoformat()}
+                session_data.update(ended)
+                self._hset_with_ttl(f"voice_session:{user_id}", ended, SESSION_TTL)
                 
                 # Generate goodbye message
                 language = session_data.get('language', 'en-US')
@@ -396,7 +626,7 @@ class VoiceConversationManager:
                 success, audio_file = self.tts_engine.synthesize_speech(goodbye_text, settings)
                 
                 # Store conversation summary
-                self._store_conversation_summary(user_id)
+                self._store_conversation_summary(user_id, session_data.get('started_at', ''), ended['ended_at'])
                 
                 self.conversation_active = False
                 
@@ -404,8 +634,8 @@ class VoiceConversationManager:
                     'success': True,
                     'goodbye_audio': audio_file if success else None,
                     'goodbye_text': goodbye_text,
-                    'conversation_turns': len(self.conversation_history),
-                    'duration': self._calculate_session_duration(session_data)
+                    'conversation_turns': self.turn_count,
+                    'duration': self._calculate_session_duration(session_data, ended_at)
                 }
             
             return {'success': True, 'message': 'No active session to end'}
@@ -422,8 +652,8 @@ class VoiceConversationManager:
         try:
             # Validate settings
             voice_settings = VoiceSettings(
-                language=VoiceLanguage(settings.get('language', 'en-US')),
-                gender=VoiceGender(settings.get('gender', 'female')),
+                language=_LANG_ENUM[settings.get('language', 'en-US')],
+                gender=_GENDER_ENUM[settings.get('gender', 'female')],
                 speed=float(settings.get('speed', 1.0)),
                 pitch=float(settings.get('pitch', 1.0)),
                 volume=float(settings.get('volume', 1.0))
@@ -439,7 +669,7 @@ class VoiceConversationManager:
                 'updated_at': datetime.now().isoformat()
             }
             
-            self.redis_client.hset(f"voice_settings:{user_id}", mapping=settings_data)
+            self._hset_with_ttl(f"voice_settings:{user_id}", settings_data, SETTINGS_TTL)
             self.user_settings[user_id] = voice_settings
             
             return True
@@ -453,14 +683,20 @@ class VoiceConversationManager:
         if user_id in self.user_settings:
             return self.user_settings[user_id]
         
-        # Load from Redis
-        settings_data = self.redis_client.hgetall(f"voice_settings:{user_id}")
-        
+        # Load from Redis, refreshing the TTL of settings that are in use
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hgetall(f"voice_settings:{user_id}")
+        pipe.expire(f"voice_settings:{user_id}", SETTINGS_TTL)
+        settings_data, _ = pipe.execute()
+        return self._load_user_voice_settings(user_id, settings_data)
+    
+    def _load_user_voice_settings(self, user_id: str, settings_data: Dict[str, str]) -> VoiceSettings:
+        """Build and cache user voice settings from a stored hash"""
         if settings_data:
             try:
                 voice_settings = VoiceSettings(
-                    language=VoiceLanguage(settings_data['language']),
-                    gender=VoiceGender(settings_data['gender']),
+                    language=_LANG_ENUM[settings_data['language']],
+                    gender=_GENDER_ENUM[settings_data['gender']],
                     speed=float(settings_data['speed']),
                     pitch=float(settings_data['pitch']),
                     volume=float(settings_data['volume'])
@@ -473,62 +709,52 @@ class VoiceConversationManager:
         # Return default settings
         return self.tts_engine.default_settings
     
+    def _hset_with_ttl(self, key: str, mapping: Dict[str, Any], ttl: int):
+        """Write hash fields and (re)set the key's TTL in one round-trip"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, ttl)
+        pipe.execute()
+    
     def _get_welcome_message(self, language: str) -> str:
         """Get welcome message in specified language"""
-        messages = {
-            'en-US': "Hello! I'm your AI assistant. How can I help you today?",
-            'vi-VN': "Xin chào! Tôi là trợ lý AI của bạn. Tôi có thể giúp gì cho bạn hôm nay?",
-            'zh-CN': "您好！我是您的AI助手。今天我能为您做些什么？",
-            'ja-JP': "こんにちは！私はあなたのAIアシスタントです。今日はどのようにお手伝いできますか？",
-            'ko-KR': "안녕하세요! 저는 당신의 AI 어시스턴트입니다. 오늘 어떻게 도와드릴까요?",
-            'es-ES': "¡Hola! Soy tu asistente de IA. ¿Cómo puedo ayudarte hoy?",
-            'fr-FR': "Bonjour! Je suis votre assistant IA. Comment puis-je vous aider aujourd'hui?",
-            'de-DE': "Hallo! Ich bin Ihr KI-Assistent. Wie kann ich Ihnen heute helfen?",
-        }
-        return messages.get(language, messages['en-US'])
+        return _WELCOME_MESSAGES.get(language, _WELCOME_MESSAGES['en-US'])
     
     def _get_goodbye_message(self, language: str) -> str:
         """Get goodbye message in specified language"""
-        messages = {
-            'en-US': "Thank you for using the voice assistant. Have a great day!",
-            'vi-VN': "Cảm ơn bạn đã sử dụng trợ lý giọng nói. Chúc bạn một ngày tốt lành!",
-            'zh-CN': "感谢您使用语音助手。祝您有美好的一天！",
-            'ja-JP': "音声アシスタントをご利用いただき、ありがとうございました。良い一日をお過ごしください！",
-            'ko-KR': "음성 어시스턴트를 사용해 주셔서 감사합니다. 좋은 하루 되세요!",
-            'es-ES': "Gracias por usar el asistente de voz. ¡Que tengas un gran día!",
-            'fr-FR': "Merci d'avoir utilisé l'assistant vocal. Passez une excellente journée!",
-            'de-DE': "Vielen Dank für die Nutzung des Sprachassistenten. Haben Sie einen schönen Tag!",
-        }
-        return messages.get(language, messages['en-US'])
+        return _GOODBYE_MESSAGES.get(language, _GOODBYE_MESSAGES['en-US'])
     
-    def _store_conversation_turn(self, user_id: str, user_input: str, ai_response: str):
+    def _store_conversation_turn(self, user_id: str, user_input: str, ai_response: str, timestamp: str = None):
         """Store conversation turn in Redis"""
         turn_data = {
             'user_input': user_input,
             'ai_response': ai_response,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp or datetime.now().isoformat()
         }
         
-        self.redis_client.lpush(f"voice_conversation:{user_id}", json.dumps(turn_data))
-        self.redis_client.ltrim(f"voice_conversation:{user_id}", 0, 99)  # Keep last 100 turns
+        key = f"voice_conversation:{user_id}"
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.lpush(key, orjson.dumps(turn_data))
+        pipe.ltrim(key, 0, 99)  # Keep last 100 turns
+        pipe.execute()
     
-    def _store_conversation_summary(self, user_id: str):
-        """Store conversation summary"""
+    def _store_conversation_summary(self, user_id: str, started_at: str, ended_at: str = None):
+        """Store conversation summary; the turns themselves stay in the conversation list"""
         summary_data = {
             'user_id': user_id,
-            'total_turns': len(self.conversation_history),
-            'started_at': self.redis_client.hget(f"voice_session:{user_id}", 'started_at'),
-            'ended_at': datetime.now().isoformat(),
-            'conversation_history': json.dumps(self.conversation_history)
+            'total_turns': self.turn_count,
+            'started_at': started_at,
+            'ended_at': ended_at or datetime.now().isoformat(),
+            'conversation_key': f"voice_conversation:{user_id}"
         }
         
         self.redis_client.hset(f"voice_summary:{user_id}:{int(time.time())}", mapping=summary_data)
     
-    def _calculate_session_duration(self, session_data: Dict[str, str]) -> str:
+    def _calculate_session_duration(self, session_data: Dict[str, str], end_time: datetime = None) -> str:
         """Calculate session duration"""
         try:
             start_time = datetime.fromisoformat(session_data['started_at'])
-            end_time = datetime.now()
+            end_time = end_time or datetime.now()
             duration = end_time - start_time
             
             minutes = int(duration.total_seconds() // 60)
@@ -538,8 +764,16 @@ class VoiceConversationManager:
         except:
             return "Unknown"
 
-# Global voice interface instance
-voice_manager = VoiceConversationManager()
+@lru_cache(maxsize=1)
+def get_voice_manager() -> VoiceConversationManager:
+    """Process-wide VoiceConversationManager"""
+    return VoiceConversationManager()
+
+def __getattr__(name: str):
+    """Build the global voice_manager on first access"""
+    if name == 'voice_manager':
+        return get_voice_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def initialize_voice_interface():
     """Initialize voice interface system"""
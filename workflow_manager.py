@@ -3,17 +3,62 @@ Workflow Manager for AI Assistant
 Manages creation, execution, and monitoring of automated workflows
 """
 
-import json
+import orjson
+import re
 import uuid
+import copy
+import time
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple
+from types import MappingProxyType
 import redis
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import logging
 
 logger = logging.getLogger(__name__)
 
+# {{ name }} placeholders in step configs, filled from the run context
+_PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+def render_placeholders(value: Any, context: Dict[str, Any]) -> Any:
+    """Fill {{name}} placeholders in a string from context; other values pass through"""
+    if not isinstance(value, str) or '{{' not in value:
+        return value
+    return _PLACEHOLDER_PATTERN.sub(lambda match: str(context.get(match.group(1), '')), value)
+
+# Sorted set of interval-scheduled workflow ids, scored by next run time (epoch seconds)
+SCHEDULED_WORKFLOWS_KEY = "scheduled_workflows"
+
+# Schedule the next interval run only if the workflow is still active; status
+# check and ZADD run atomically so a pause in between can't slip through
+_SCHEDULE_WORKFLOW_LUA = """
+if redis.call('HGET', KEYS[1], 'status') ~= 'active' then
+    return 0
+end
+redis.call('ZADD', KEYS[2], tonumber(ARGV[1]) + tonumber(ARGV[2]), ARGV[3])
+return 1
+"""
+
+# Executions kept per workflow in its history stream (trimmed approximately)
+HISTORY_MAXLEN = 100
+
+def _is_wrongtype(error: Exception) -> bool:
+    """Whether a Redis error is a key holding the wrong data type"""
+    return str(error).startswith('WRONGTYPE')
+
+# Fields listing endpoints show; no JSON blobs
+_SUMMARY_FIELDS = ('name', 'description', 'status', 'created_at', 'last_run', 'run_count')
+
+# JSON-encoded hash fields, fetched only when the workflow changed
+_BLOB_FIELDS = ('trigger', 'steps', 'tags', 'execution_order', 'parallel_layers')
+
+# Small hash fields read on every get; the JSON blobs are only fetched when they changed
+_SCALAR_FIELDS = ('id', 'user_id', 'name', 'description', 'status', 'created_at', 'updated_at',
+                  'last_run', 'run_count', 'success_count', 'error_count')
+
 class TriggerType(Enum):
     SCHEDULE = "schedule"
     EVENT = "event"
@@ -26,7 +71,11 @@ class WorkflowStatus(Enum):
     DISABLED = "disabled"
     ERROR = "error"
 
-@dataclass
+# Stored value -> member, for rebuilding workflows read back from Redis
+_TRIGGER_BY_VALUE = {member.value: member for member in TriggerType}
+_STATUS_BY_VALUE = {member.value: member for member in WorkflowStatus}
+
+@dataclass(slots=True)
 class WorkflowStep:
     id: str
     type: str
@@ -37,13 +86,13 @@ class WorkflowStep:
     timeout: int = 300  # 5 minutes
     stop_on_error: bool = True
 
-@dataclass
+@dataclass(slots=True)
 class WorkflowTrigger:
     type: TriggerType
     config: Dict[str, Any]
     enabled: bool = True
 
-@dataclass
+@dataclass(slots=True)
 class Workflow:
     id: str
     user_id: str
@@ -59,13 +108,210 @@ class Workflow:
     success_count: int = 0
     error_count: int = 0
     tags: List[str] = None
+    execution_order: List[str] = None  # step ids, dependencies first
+    parallel_layers: List[List[str]] = None  # steps in a layer only depend on earlier layers
+
+def _topo_sort(steps: List[WorkflowStep]) -> Tuple[List[str], List[List[str]]]:
+    """Order steps with Kahn's algorithm, grouped into layers that can run in parallel"""
+    step_ids = [step.id for step in steps]
+    known_ids = set(step_ids)
+    if len(known_ids) < len(step_ids):
+        raise ValueError("Duplicate step ids in workflow steps")
+    for step in steps:
+        for dependency in step.dependencies or []:
+            if dependency not in known_ids:
+                raise ValueError(f"Step {step.id} depends on unknown step {dependency}")
+    
+    # Without declared dependencies, steps keep their implicit list-order sequencing
+    if not any(step.dependencies for step in steps):
+        return step_ids, [[step_id] for step_id in step_ids]
+    
+    # Each step's unmet dependencies as a bitmask over step indices
+    index_of = {step_id: i for i, step_id in enumerate(step_ids)}
+    masks = [0] * len(steps)
+    for i, step in enumerate(steps):
+        for dependency in step.dependencies or []:
+            masks[i] |= 1 << index_of[dependency]
+    
+    order = []
+    layers = []
+    pending = set(range(len(steps)))
+    while pending:
+        ready = [i for i in sorted(pending) if not masks[i]]
+        if not ready:
+            break
+        done_mask = 0
+        for i in ready:
+            done_mask |= 1 << i
+        pending.difference_update(ready)
+        for i in pending:
+            masks[i] &= ~done_mask
+        layer = [step_ids[i] for i in ready]
+        layers.append(layer)
+        order.extend(layer)
+    
+    if len(order) < len(step_ids):
+        raise ValueError("Cycle detected in workflow steps")
+    return order, layers
+
+# Predefined workflow templates, built once at import
+_WORKFLOW_TEMPLATES = {
+    'daily_summary': {
+        'name': 'Daily Summary Report',
+        'description': 'Generate and send daily summary of activities',
+        'trigger': {
+            'type': 'schedule',
+            'config': {
+                'type': 'cron',
+                'cron_expression': '0 18 * * *'  # 6 PM daily
+            }
+        },
+        'steps': [
+            {
+                'type': 'ai_task',
+                'name': 'Generate Summary',
+                'config': {
+                    'prompt': 'Generate a summary of today\'s activities and tasks'
+                }
+            },
+            {
+                'type': 'email',
+                'name': 'Send Summary',
+                'config': {
+                    'subject': 'Daily Summary - {{date}}',
+                    'template': 'daily_summary'
+                }
+            }
+        ]
+    },
+    'email_auto_reply': {
+        'name': 'Email Auto-Reply',
+        'description': 'Automatically reply to emails based on content analysis',
+        'trigger': {
+            'type': 'event',
+            'config': {
+                'event_type': 'email_received'
+            }
+        },
+        'steps': [
+            {
+                'type': 'ai_task',
+                'name': 'Analyze Email',
+                'config': {
+                    'prompt': 'Analyze this email and determine if it needs an auto-reply: {{email_content}}'
+                }
+            },
+            {
+                'type': 'conditional',
+                'name': 'Check Reply Needed',
+                'config': {
+                    'condition': 'ai_response.needs_reply == true'
+                }
+            },
+            {
+                'type': 'ai_task',
+                'name': 'Generate Reply',
+                'config': {
+                    'prompt': 'Generate an appropriate reply to this email: {{email_content}}'
+                }
+            },
+            {
+                'type': 'email',
+                'name': 'Send Reply',
+                'config': {
+                    'to': '{{email_sender}}',
+                    'subject': 'Re: {{email_subject}}',
+                    'body': '{{ai_generated_reply}}'
+                }
+            }
+        ]
+    },
+    'social_media_scheduler': {
+        'name': 'Social Media Scheduler',
+        'description': 'Schedule and post content to social media platforms',
+        'trigger': {
+            'type': 'schedule',
+            'config': {
+                'type': 'cron',
+                'cron_expression': '0 9,15 * * *'  # 9 AM and 3 PM daily
+            }
+        },
+        'steps': [
+            {
+                'type': 'ai_task',
+                'name': 'Generate Content',
+                'config': {
+                    'prompt': 'Generate engaging social media content for today'
+                }
+            },
+            {
+                'type': 'social_media_post',
+                'name': 'Post to Facebook',
+                'config': {
+                    'platform': 'facebook',
+                    'content': '{{ai_generated_content}}'
+                }
+            },
+            {
+                'type': 'social_media_post',
+                'name': 'Post to Twitter',
+                'config': {
+                    'platform': 'twitter',
+                    'content': '{{ai_generated_content}}'
+                }
+            }
+        ]
+    },
+    'task_reminder': {
+        'name': 'Task Reminder System',
+        'description': 'Send reminders for upcoming tasks and deadlines',
+        'trigger': {
+            'type': 'schedule',
+            'config': {
+                'type': 'interval',
+                'interval_seconds': 3600  # Every hour
+            }
+        },
+        'steps': [
+            {
+                'type': 'ai_task',
+                'name': 'Check Upcoming Tasks',
+                'config': {
+                    'prompt': 'Check for tasks due in the next 24 hours'
+                }
+            },
+            {
+                'type': 'conditional',
+                'name': 'Has Upcoming Tasks',
+                'config': {
+                    'condition': 'ai_response.has_upcoming_tasks == true'
+                }
+            },
+            {
+                'type': 'email',
+                'name': 'Send Reminder',
+                'config': {
+                    'subject': 'Task Reminder - Upcoming Deadlines',
+                    'template': 'task_reminder'
+                }
+            }
+        ]
+    }
+}
 
 class WorkflowManager:
     """Manages automated workflows for the AI Assistant"""
     
     def __init__(self, redis_client: redis.Redis):
         self.redis = redis_client
-        self.workflow_templates = self._load_workflow_templates()
+        self.workflow_templates = MappingProxyType(_WORKFLOW_TEMPLATES)
+        self._schedule_workflow = self.redis.register_script(_SCHEDULE_WORKFLOW_LUA)
+        
+        # Raw JSON fields per workflow, tagged with the updated_at they were read at.
+        # Kept as bytes and parsed per call so every caller gets its own objects
+        self.blob_cache_size = 1024
+        self._blob_cache: OrderedDict = OrderedDict()
+        self._blob_cache_lock = threading.Lock()
     
     def create_workflow(self, user_id: str, workflow_config: Dict[str, Any]) -> str:
         """Create a new workflow"""
@@ -94,6 +340,9 @@ class WorkflowManager:
             )
             steps.append(step)
         
+        # Resolve execution order once; rejects cyclic step graphs before anything is stored
+        execution_order, parallel_layers = _topo_sort(steps)
+        
         # Create workflow object
         workflow = Workflow(
             id=workflow_id,
@@ -105,81 +354,170 @@ class WorkflowManager:
             status=WorkflowStatus.ACTIVE,
             created_at=datetime.now(),
             updated_at=datetime.now(),
-            tags=workflow_config.get('tags', [])
+            tags=workflow_config.get('tags', []),
+            execution_order=execution_order,
+            parallel_layers=parallel_layers
         )
         
         # Store workflow
         self._store_workflow(workflow)
         
         # Set up trigger if needed
-        if trigger.type == TriggerType.SCHEDULE:
-            self._setup_schedule_trigger(workflow)
-        elif trigger.type == TriggerType.EVENT:
-            self._setup_event_trigger(workflow)
+        if trigger.type in (TriggerType.SCHEDULE, TriggerType.EVENT):
+            pipe = self.redis.pipeline(transaction=False)
+            if trigger.type == TriggerType.SCHEDULE:
+                self._setup_schedule_trigger(workflow_id, trigger, pipe)
+            else:
+                self._setup_event_trigger(workflow_id, trigger, pipe)
+            pipe.execute()
         
         logger.info(f"Created workflow {workflow_id} for user {user_id}")
         return workflow_id
     
     def get_workflow(self, workflow_id: str) -> Optional[Workflow]:
         """Get workflow by ID"""
-        workflow_data = self.redis.hgetall(f"workflow:{workflow_id}")
+        key = f"workflow:{workflow_id}"
+        values = self.redis.hmget(key, _SCALAR_FIELDS)
+        if all(value is None for value in values):
+            return None
+        workflow_data = dict(zip(_SCALAR_FIELDS, values))
+        
+        # Skip re-fetching the blobs while updated_at is unchanged
+        version = workflow_data['updated_at']
+        with self._blob_cache_lock:
+            cached = self._blob_cache.get(workflow_id)
+            if cached is not None and cached[0] == version:
+                self._blob_cache.move_to_end(workflow_id)
+                return self._deserialize_workflow({**workflow_data, **cached[1]})
+        
+        # Changed or not cached: read the whole hash so fields and blobs agree
+        workflow_data = self.redis.hgetall(key)
         if not workflow_data:
             return None
+        version = workflow_data.get('updated_at')
+        if version is not None:
+            blobs = {field: workflow_data.get(field) for field in _BLOB_FIELDS}
+            with self._blob_cache_lock:
+                self._blob_cache[workflow_id] = (version, blobs)
+                self._blob_cache.move_to_end(workflow_id)
+                if len(self._blob_cache) > self.blob_cache_size:
+                    self._blob_cache.popitem(last=False)
         
         return self._deserialize_workflow(workflow_data)
     
     def list_user_workflows(self, user_id: str) -> List[Workflow]:
         """List all workflows for a user"""
         workflow_ids = self.redis.smembers(f"user_workflows:{user_id}")
-        workflows = []
+        if not workflow_ids:
+            return []
+        
+        # Fetch every workflow hash in one round-trip
+        pipe = self.redis.pipeline(transaction=False)
+        for workflow_id in workflow_ids:
+            pipe.hgetall(f"workflow:{workflow_id}")
+        
+        return [self._deserialize_workflow(workflow_data)
+                for workflow_data in pipe.execute() if workflow_data]
+    
+    def list_user_workflows_summary(self, user_id: str) -> List[Dict[str, Any]]:
+        """List a user's workflows with only the fields a listing shows"""
+        workflow_ids = list(self.redis.smembers(f"user_workflows:{user_id}"))
+        if not workflow_ids:
+            return []
         
+        pipe = self.redis.pipeline(transaction=False)
         for workflow_id in workflow_ids:
-            workflow = self.get_workflow(workflow_id)
-            if workflow:
-                workflows.append(workflow)
+            pipe.hmget(f"workflow:{workflow_id}", _SUMMARY_FIELDS)
         
-        return workflows
+        summaries = []
+        for workflow_id, (name, description, status, created_at, last_run, run_count) in zip(workflow_ids, pipe.execute()):
+            if name is None:
+                continue
+            summaries.append({
+                'id': workflow_id,
+                'name': name,
+                'description': description,
+                'status': status,
+                'created_at': created_at,
+                'last_run': last_run or None,
+                'run_count': int(run_count or 0)
+            })
+        return summaries
     
     def update_workflow(self, workflow_id: str, updates: Dict[str, Any]) -> bool:
         """Update workflow configuration"""
-        workflow = self.get_workflow(workflow_id)
-        if not workflow:
+        key = f"workflow:{workflow_id}"
+        if not self.redis.exists(key):
             return False
         
-        # Update fields
+        # Serialize only the changed fields; the rest of the hash is left untouched
+        changes = {}
         if 'name' in updates:
-            workflow.name = updates['name']
+            changes['name'] = updates['name']
         if 'description' in updates:
-            workflow.description = updates['description']
+            changes['description'] = updates['description']
         if 'status' in updates:
-            workflow.status = WorkflowStatus(updates['status'])
+            changes['status'] = WorkflowStatus(updates['status']).value
         if 'steps' in updates:
-            workflow.steps = [WorkflowStep(**step) for step in updates['steps']]
+            steps = [WorkflowStep(**step) for step in updates['steps']]
+            execution_order, parallel_layers = _topo_sort(steps)
+            changes['steps'] = orjson.dumps(steps)
+            changes['execution_order'] = orjson.dumps(execution_order)
+            changes['parallel_layers'] = orjson.dumps(parallel_layers)
+        trigger = None
         if 'trigger' in updates:
-            workflow.trigger = WorkflowTrigger(**updates['trigger'])
+            trigger = WorkflowTrigger(**updates['trigger'])
+            trigger.type = TriggerType(trigger.type)
+            changes['trigger'] = orjson.dumps(trigger)
         
-        workflow.updated_at = datetime.now()
+        changes['updated_at'] = datetime.now().isoformat()
         
-        # Store updated workflow
-        self._store_workflow(workflow)
+        if trigger is None:
+            # Store updated fields
+            self.redis.hset(key, mapping=changes)
+            return True
+        
+        # A new trigger replaces the old schedule and event subscriptions in the
+        # same MULTI/EXEC as the field update, so the indexes never disagree with it
+        event_types = self.redis.smembers(f"workflow_events:{workflow_id}")
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(key, mapping=changes)
+        self._cancel_scheduled_tasks(workflow_id, pipe)
+        self._remove_event_triggers(workflow_id, event_types, pipe)
+        if trigger.type == TriggerType.SCHEDULE:
+            self._setup_schedule_trigger(workflow_id, trigger, pipe)
+        elif trigger.type == TriggerType.EVENT:
+            self._setup_event_trigger(workflow_id, trigger, pipe)
+        pipe.execute()
         
         return True
     
     def delete_workflow(self, workflow_id: str) -> bool:
         """Delete a workflow"""
-        workflow = self.get_workflow(workflow_id)
-        if not workflow:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hget(f"workflow:{workflow_id}", 'user_id')
+        pipe.smembers(f"workflow_events:{workflow_id}")
+        user_id, event_types = pipe.execute()
+        if user_id is None:
             return False
         
+        # All cleanup commits together in one MULTI/EXEC, so a crash can't leave orphans
+        pipe = self.redis.pipeline(transaction=True)
+        
         # Remove from user's workflow list
-        self.redis.srem(f"user_workflows:{workflow.user_id}", workflow_id)
+        pipe.srem(f"user_workflows:{user_id}", workflow_id)
         
         # Delete workflow data
-        self.redis.delete(f"workflow:{workflow_id}")
-        self.redis.delete(f"workflow_history:{workflow_id}")
+        pipe.delete(f"workflow:{workflow_id}", f"workflow_history:{workflow_id}")
+        
+        # Cancel scheduled tasks and event subscriptions if any
+        self._cancel_scheduled_tasks(workflow_id, pipe)
+        self._remove_event_triggers(workflow_id, event_types, pipe)
         
-        # Cancel scheduled tasks if any
-        self._cancel_scheduled_tasks(workflow_id)
+        pipe.execute()
+        
+        with self._blob_cache_lock:
+            self._blob_cache.pop(workflow_id, None)
         
         logger.info(f"Deleted workflow {workflow_id}")
         return True
@@ -189,7 +527,7 @@ class WorkflowManager:
         from background_worker import execute_workflow
         
         # Queue workflow for execution
-        task = execute_workflow.delay(workflow_id)
+        task = execute_workflow.delay(workflow_id, context)
         
         return {
             'task_id': task.id,
@@ -197,17 +535,108 @@ class WorkflowManager:
             'workflow_id': workflow_id
         }
     
+    def record_run(self, workflow_id: str, success: bool, ran_at: datetime = None):
+        """Update a workflow's run statistics in place, without a read-modify-write"""
+        key = f"workflow:{workflow_id}"
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(key, 'last_run', (ran_at or datetime.now()).isoformat())
+        pipe.hincrby(key, 'run_count', 1)
+        pipe.hincrby(key, 'success_count' if success else 'error_count', 1)
+        pipe.execute()
+    
+    def pop_due_workflows(self, now: float = None) -> List[str]:
+        """Return interval workflows due to run and push each one's next run forward"""
+        now = now or time.time()
+        due = self.redis.zrangebyscore(SCHEDULED_WORKFLOWS_KEY, 0, now)
+        if not due:
+            return []
+        
+        pipe = self.redis.pipeline(transaction=False)
+        for workflow_id in due:
+            pipe.hmget(f"workflow:{workflow_id}", 'status', 'trigger')
+        
+        runnable = []
+        reschedule = {}
+        for workflow_id, (status, trigger) in zip(due, pipe.execute()):
+            if not trigger:
+                continue
+            trigger = orjson.loads(trigger)
+            if trigger['type'] != TriggerType.SCHEDULE.value or trigger['config'].get('type') != 'interval':
+                continue
+            # Paused workflows keep their slot so they resume on schedule, but don't run
+            reschedule[workflow_id] = now + trigger['config'].get('interval_seconds', 3600)
+            if status == WorkflowStatus.ACTIVE.value:
+                runnable.append(workflow_id)
+        
+        # Deleted workflows and ones no longer on an interval drop out of the schedule
+        pipe = self.redis.pipeline(transaction=False)
+        if reschedule:
+            pipe.zadd(SCHEDULED_WORKFLOWS_KEY, reschedule)
+        stale = [workflow_id for workflow_id in due if workflow_id not in reschedule]
+        if stale:
+            pipe.zrem(SCHEDULED_WORKFLOWS_KEY, *stale)
+        pipe.execute()
+        
+        return runnable
+    
+    def append_history(self, workflow_id: str, entry: Dict[str, Any]) -> str:
+        """Append an execution result to the workflow's history stream"""
+        key = f"workflow_history:{workflow_id}"
+        try:
+            return self.redis.xadd(key, {'entry': orjson.dumps(entry)}, maxlen=HISTORY_MAXLEN, approximate=True)
+        except redis.ResponseError as e:
+            if not _is_wrongtype(e):
+                raise
+            self._migrate_legacy_history(key)
+            return self.redis.xadd(key, {'entry': orjson.dumps(entry)}, maxlen=HISTORY_MAXLEN, approximate=True)
+    
     def get_workflow_history(self, workflow_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get execution history for a workflow"""
-        history_data = self.redis.lrange(f"workflow_history:{workflow_id}", 0, limit - 1)
-        return [json.loads(data) for data in history_data]
+        """Get execution history for a workflow, newest first"""
+        return self.get_workflow_histories([workflow_id], limit)[workflow_id]
+    
+    def get_workflow_histories(self, workflow_ids: List[str], limit: int = 50) -> Dict[str, List[Dict[str, Any]]]:
+        """Get execution history for several workflows in one round-trip"""
+        pipe = self.redis.pipeline(transaction=False)
+        for workflow_id in workflow_ids:
+            pipe.xrevrange(f"workflow_history:{workflow_id}", count=limit)
+        
+        histories = {}
+        for workflow_id, history_data in zip(workflow_ids, pipe.execute(raise_on_error=False)):
+            if isinstance(history_data, redis.ResponseError):
+                if not _is_wrongtype(history_data):
+                    raise history_data
+                key = f"workflow_history:{workflow_id}"
+                self._migrate_legacy_history(key)
+                history_data = self.redis.xrevrange(key, count=limit)
+            histories[workflow_id] = [orjson.loads(fields['entry']) for _, fields in history_data]
+        return histories
+    
+    def _migrate_legacy_history(self, key: str):
+        """Convert a history list written by older builds (LPUSH, newest first) into a stream"""
+        with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    if pipe.type(key) != 'list':
+                        return
+                    entries = pipe.lrange(key, 0, HISTORY_MAXLEN - 1)
+                    pipe.multi()
+                    pipe.delete(key)
+                    for entry in reversed(entries):
+                        pipe.xadd(key, {'entry': entry})
+                    pipe.execute()
+                    logger.info(f"Migrated {len(entries)} history entries in {key} to a stream")
+                    return
+                except redis.WatchError:
+                    continue
     
     def create_from_template(self, user_id: str, template_name: str, config: Dict[str, Any]) -> str:
         """Create workflow from a predefined template"""
         if template_name not in self.workflow_templates:
             raise ValueError(f"Template {template_name} not found")
         
-        template = self.workflow_templates[template_name].copy()
+        # Deep copy: templates hold nested dicts that create_workflow must not share
+        template = copy.deepcopy(_WORKFLOW_TEMPLATES[template_name])
         
         # Merge user config with template
         template.update(config)
@@ -215,19 +644,22 @@ class WorkflowManager:
         
         return self.create_workflow(user_id, template)
     
-    def get_available_templates(self) -> Dict[str, Dict[str, Any]]:
+    def get_available_templates(self) -> Mapping[str, Dict[str, Any]]:
         """Get all available workflow templates"""
         return self.workflow_templates
     
     def _store_workflow(self, workflow: Workflow):
         """Store workflow in Redis"""
-        workflow_data = self._serialize_workflow(workflow)
-        
-        # Store workflow
-        self.redis.hset(f"workflow:{workflow.id}", mapping=workflow_data)
-        
-        # Add to user's workflow list
-        self.redis.sadd(f"user_workflows:{workflow.user_id}", workflow.id)
+        self._store_workflows_bulk([workflow])
+    
+    def _store_workflows_bulk(self, workflows: List[Workflow]):
+        """Store several workflows in one round-trip"""
+        pipe = self.redis.pipeline(transaction=False)
+        for workflow in workflows:
+            # Store workflow and add it to the user's workflow list
+            pipe.hset(f"workflow:{workflow.id}", mapping=self._serialize_workflow(workflow))
+            pipe.sadd(f"user_workflows:{workflow.user_id}", workflow.id)
+        pipe.execute()
     
     def _serialize_workflow(self, workflow: Workflow) -> Dict[str, str]:
         """Serialize workflow to Redis-compatible format"""
@@ -236,8 +668,9 @@ class WorkflowManager:
             'user_id': workflow.user_id,
             'name': workflow.name,
             'description': workflow.description,
-            'trigger': json.dumps(asdict(workflow.trigger)),
-            'steps': json.dumps([asdict(step) for step in workflow.steps]),
+            # orjson serializes the dataclasses and the TriggerType enum natively
+            'trigger': orjson.dumps(workflow.trigger),
+            'steps': orjson.dumps(workflow.steps),
             'status': workflow.status.value,
             'created_at': workflow.created_at.isoformat(),
             'updated_at': workflow.updated_at.isoformat(),
@@ -245,43 +678,60 @@ class WorkflowManager:
             'run_count': str(workflow.run_count),
             'success_count': str(workflow.success_count),
             'error_count': str(workflow.error_count),
-            'tags': json.dumps(workflow.tags or [])
+            'tags': orjson.dumps(workflow.tags or []),
+            'execution_order': orjson.dumps(workflow.execution_order or []),
+            'parallel_layers': orjson.dumps(workflow.parallel_layers or [])
         }
     
     def _deserialize_workflow(self, workflow_data: Dict[str, str]) -> Workflow:
         """Deserialize workflow from Redis format"""
-        trigger_data = json.loads(workflow_data['trigger'])
+        return self._build_workflow(workflow_data, *self._parse_workflow_blobs(workflow_data))
+    
+    def _parse_workflow_blobs(self, workflow_data: Dict[str, str]):
+        """Parse the JSON-encoded trigger, steps, tags and execution order fields"""
+        trigger_data = orjson.loads(workflow_data['trigger'])
         trigger = WorkflowTrigger(
-            type=TriggerType(trigger_data['type']),
+            type=_TRIGGER_BY_VALUE[trigger_data['type']],
             config=trigger_data['config'],
             enabled=trigger_data['enabled']
         )
         
-        steps_data = json.loads(workflow_data['steps'])
+        steps_data = orjson.loads(workflow_data['steps'])
         steps = [WorkflowStep(**step_data) for step_data in steps_data]
         
+        # Workflows stored before execution order was persisted have neither field
+        execution_order = orjson.loads(workflow_data.get('execution_order') or b'[]') or None
+        parallel_layers = orjson.loads(workflow_data.get('parallel_layers') or b'[]') or None
+        
+        return trigger, steps, orjson.loads(workflow_data['tags']), execution_order, parallel_layers
+    
+    def _build_workflow(self, workflow_data: Dict[str, str], trigger: WorkflowTrigger,
+                        steps: List[WorkflowStep], tags: List[str],
+                        execution_order: Optional[List[str]],
+                        parallel_layers: Optional[List[List[str]]]) -> Workflow:
+        """Assemble a Workflow from its scalar fields and parsed blobs"""
         return Workflow(
             id=workflow_data['id'],
             user_id=workflow_data['user_id'],
             name=workflow_data['name'],
             description=workflow_data['description'],
             trigger=trigger,
-            steps=steps,
-            status=WorkflowStatus(workflow_data['status']),
+            steps=list(steps),
+            status=_STATUS_BY_VALUE[workflow_data['status']],
             created_at=datetime.fromisoformat(workflow_data['created_at']),
             updated_at=datetime.fromisoformat(workflow_data['updated_at']),
             last_run=datetime.fromisoformat(workflow_data['last_run']) if workflow_data['last_run'] else None,
             run_count=int(workflow_data['run_count']),
             success_count=int(workflow_data['success_count']),
             error_count=int(workflow_data['error_count']),
-            tags=json.loads(workflow_data['tags'])
+            tags=list(tags),
+            execution_order=execution_order,
+            parallel_layers=parallel_layers
         )
     
-    def _setup_schedule_trigger(self, workflow: Workflow):
-        """Set up scheduled trigger for workflow"""
-        from background_worker import execute_workflow
-        
-        trigger_config = workflow.trigger.config
+    def _setup_schedule_trigger(self, workflow_id: str, trigger: WorkflowTrigger, pipe: redis.client.Pipeline):
+        """Queue setting up a scheduled trigger for a workflow"""
+        trigger_config = trigger.config
         
         if trigger_config.get('type') == 'cron':
             # Use Celery beat for cron scheduling
@@ -292,169 +742,33 @@ class WorkflowManager:
             pass
         
         elif trigger_config.get('type') == 'interval':
-            # Schedule recurring execution
+            # Schedule recurring execution; the beat dispatcher picks it up when due
             interval_seconds = trigger_config.get('interval_seconds', 3600)
-            execute_workflow.apply_async(
-                args=[workflow.id],
-                countdown=interval_seconds
+            self._schedule_workflow(
+                keys=[f"workflow:{workflow_id}", SCHEDULED_WORKFLOWS_KEY],
+                args=[time.time(), interval_seconds, workflow_id],
+                client=pipe
             )
     
-    def _setup_event_trigger(self, workflow: Workflow):
-        """Set up event-based trigger for workflow"""
-        # Register workflow for event listening
-        event_type = workflow.trigger.config.get('event_type')
+    def _setup_event_trigger(self, workflow_id: str, trigger: WorkflowTrigger, pipe: redis.client.Pipeline):
+        """Queue setting up an event-based trigger for a workflow"""
+        # Register workflow for event listening, indexed both ways so deletion can clean up
+        event_type = trigger.config.get('event_type')
         if event_type:
-            self.redis.sadd(f"event_workflows:{event_type}", workflow.id)
+            pipe.sadd(f"event_workflows:{event_type}", workflow_id)
+            pipe.sadd(f"workflow_events:{workflow_id}", event_type)
     
-    def _cancel_scheduled_tasks(self, workflow_id: str):
-        """Cancel any scheduled tasks for a workflow"""
-        # This would cancel Celery tasks if we had task IDs stored
-        # For now, we'll just log
-        logger.info(f"Cancelled scheduled tasks for workflow {workflow_id}")
+    def _remove_event_triggers(self, workflow_id: str, event_types: Iterable[str], pipe: redis.client.Pipeline):
+        """Queue unsubscribing a workflow from every event it listens for"""
+        for event_type in event_types:
+            pipe.srem(f"event_workflows:{event_type}", workflow_id)
+        pipe.delete(f"workflow_events:{workflow_id}")
     
-    def _load_workflow_templates(self) -> Dict[str, Dict[str, Any]]:
-        """Load predefined workflow templates"""
-        return {
-            'daily_summary': {
-                'name': 'Daily Summary Report',
-                'description': 'Generate and send daily summary of activities',
-                'trigger': {
-                    'type': 'schedule',
-                    'config': {
-                        'type': 'cron',
-                        'cron_expression': '0 18 * * *'  # 6 PM daily
-                    }
-                },
-                'steps': [
-                    {
-                        'type': 'ai_task',
-                        'name': 'Generate Summary',
-                        'config': {
-                            'prompt': 'Generate a summary of today\'s activities and tasks'
-                        }
-                    },
-                    {
-                        'type': 'email',
-                        'name': 'Send Summary',
-                        'config': {
-                            'subject': 'Daily Summary - {{date}}',
-                            'template': 'daily_summary'
-                        }
-                    }
-                ]
-            },
-            'email_auto_reply': {
-                'name': 'Email Auto-Reply',
-                'description': 'Automatically reply to emails based on content analysis',
-                'trigger': {
-                    'type': 'event',
-                    'config': {
-                        'event_type': 'email_received'
-                    }
-                },
-                'steps': [
-                    {
-                        'type': 'ai_task',
-                        'name': 'Analyze Email',
-                        'config': {
-                            'prompt': 'Analyze this email and determine if it needs an auto-reply: {{email_content}}'
-                        }
-                    },
-                    {
-                        'type': 'conditional',
-                        'name': 'Check Reply Needed',
-                        'config': {
-                            'condition': 'ai_response.needs_reply == true'
-                        }
-                    },
-                    {
-                        'type': 'ai_task',
-                        'name': 'Generate Reply',
-                        'config': {
-                            'prompt': 'Generate an appropriate reply to this email: {{email_content}}'
-                        }
-                    },
-                    {
-                        'type': 'email',
-                        'name': 'Send Reply',
-                        'config': {
-                            'to': '{{email_sender}}',
-                            'subject': 'Re: {{email_subject}}',
-                            'body': '{{ai_generated_reply}}'
-                        }
-                    }
-                ]
-            },
-            'social_media_scheduler': {
-                'name': 'Social Media Scheduler',
-                'description': 'Schedule and post content to social media platforms',
-                'trigger': {
-                    'type': 'schedule',
-                    'config': {
-                        'type': 'cron',
-                        'cron_expression': '0 9,15 * * *'  # 9 AM and 3 PM daily
-                    }
-                },
-                'steps': [
-                    {
-                        'type': 'ai_task',
-                        'name': 'Generate Content',
-                        'config': {
-                            'prompt': 'Generate engaging social media content for today'
-                        }
-                    },
-                    {
-                        'type': 'social_media_post',
-                        'name': 'Post to Facebook',
-                        'config': {
-                            'platform': 'facebook',
-                            'content': '{{ai_generated_content}}'
-                        }
-                    },
-                    {
-                        'type': 'social_media_post',
-                        'name': 'Post to Twitter',
-                        'config': {
-                            'platform': 'twitter',
-                            'content': '{{ai_generated_content}}'
-                        }
-                    }
-                ]
-            },
-            'task_reminder': {
-                'name': 'Task Reminder System',
-                'description': 'Send reminders for upcoming tasks and deadlines',
-                'trigger': {
-                    'type': 'schedule',
-                    'config': {
-                        'type': 'interval',
-                        'interval_seconds': 3600  # Every hour
-                    }
-                },
-                'steps': [
-                    {
-                        'type': 'ai_task',
-                        'name': 'Check Upcoming Tasks',
-                        'config': {
-                            'prompt': 'Check for tasks due in the next 24 hours'
-                        }
-                    },
-                    {
-                        'type': 'conditional',
-                        'name': 'Has Upcoming Tasks',
-                        'config': {
-                            'condition': 'ai_response.has_upcoming_tasks == true'
-                        }
-                    },
-                    {
-                        'type': 'email',
-                        'name': 'Send Reminder',
-                        'config': {
-                            'subject': 'Task Reminder - Upcoming Deadlines',
-                            'template': 'task_reminder'
-                        }
-                    }
-                ]
-            }
-        }
-
+    def get_event_workflows(self, event_type: str, user_id: str) -> List[str]:
+        """Ids of a user's workflows subscribed to an event type"""
+        return list(self.redis.sinter(f"event_workflows:{event_type}", f"user_workflows:{user_id}"))
+    
+    def _cancel_scheduled_tasks(self, workflow_id: str, pipe: redis.client.Pipeline):
+        """Queue cancelling any scheduled tasks for a workflow"""
+        pipe.zrem(SCHEDULED_WORKFLOWS_KEY, workflow_id)
+        logger.info(f"Cancelled scheduled tasks for workflow {workflow_id}")